@@ -3,7 +3,7 @@ Agent Client - 连接 LLM 与 MCP 工具
 """
 import json
 import asyncio
-from typing import Callable, Optional, AsyncGenerator
+from typing import Callable, List, Optional, AsyncGenerator
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -12,9 +12,28 @@ try:
 except ImportError:
     httpx = None
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# httpx 的 HTTP/2 支持依赖 h2 (pip install "httpx[http2]")
+try:
+    import h2  # noqa: F401
+    _HTTP2_AVAILABLE = True
+except ImportError:
+    _HTTP2_AVAILABLE = False
+
 from .server import SysYToolServer, ToolResult
 
 
+def _json_dumps(obj) -> bytes:
+    """序列化为紧凑的 UTF-8 JSON（优先使用 orjson）"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
 @dataclass
 class AgentConfig:
     """Agent 配置"""
@@ -34,7 +53,7 @@ class AgentConfig:
 @dataclass
 class Message:
     """消息"""
-    role: str  # user, assistant, system, tool_call, tool_result
+    role: str  # user, assistant, system, tool_call, tool_result, tool_progress
     content: str
     tool_name: Optional[str] = None
     tool_args: Optional[dict] = None
@@ -121,7 +140,44 @@ class AgentClient:
         self.config = config
         self.tool_server = tool_server
         self.messages = []
+        # 与 messages 一一对应的已序列化 JSON 片段，每条消息只序列化一次
+        self._messages_json: List[bytes] = []
         self._stop_flag = False
+        self._http: Optional["httpx.AsyncClient"] = None
+        # 请求体中不随对话变化的部分（model/max_tokens/system/tools）预先序列化
+        self._static_body_prefix: Optional[bytes] = None
+        self._static_body_key: Optional[tuple] = None
+    
+    async def __aenter__(self) -> 'AgentClient':
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        """关闭 HTTP 连接池"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    def _get_http(self) -> "httpx.AsyncClient":
+        """获取复用的 HTTP 客户端（同一会话内保持长连接）"""
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                http2=_HTTP2_AVAILABLE,
+                timeout=httpx.Timeout(120, connect=10),
+                headers={
+                    "Content-Type": "application/json",
+                    "x-api-key": self.config.api_key,
+                    "anthropic-version": "2023-06-01"
+                },
+                limits=httpx.Limits(
+                    max_keepalive_connections=16,
+                    max_connections=32,
+                    keepalive_expiry=90
+                )
+            )
+        return self._http
     
     def stop(self):
         """停止当前执行"""
@@ -130,6 +186,7 @@ class AgentClient:
     def reset(self):
         """重置对话"""
         self.messages = []
+        self._messages_json = []
         self._stop_flag = False
     
     async def chat(self, user_message: str, 
@@ -152,13 +209,20 @@ class AgentClient:
         self._stop_flag = False
         
         # 添加用户消息
-        self.messages.append({
+        self._push_message({
             "role": "user",
             "content": user_message
         })
         on_message(Message("user", user_message))
         
-        # Agent 循环
+        # 连接池绑定在当前事件循环上，结束时关闭（GUI 每次对话使用新的事件循环）
+        try:
+            await self._agent_loop(on_message)
+        finally:
+            await self.aclose()
+    
+    async def _agent_loop(self, on_message: Callable[[Message], None]) -> None:
+        """Agent 循环：调用 API 并执行工具，直到模型不再请求工具"""
         while not self._stop_flag:
             try:
                 response = await self._call_api()
@@ -186,7 +250,7 @@ class AgentClient:
             
             # 保存助手消息
             if assistant_content:
-                self.messages.append({
+                self._push_message({
                     "role": "assistant",
                     "content": assistant_content
                 })
@@ -197,61 +261,105 @@ class AgentClient:
             
             # 处理工具调用
             tool_results = []
-            for tool_call in tool_calls:
+            for batch in self._batch_tool_calls(tool_calls):
                 if self._stop_flag:
                     break
                 
-                tool_name = tool_call.get("name", "")
-                tool_args = tool_call.get("input", {})
-                tool_id = tool_call.get("id", "")
-                
                 # 显示工具调用
-                on_message(Message("tool_call", f"调用 {tool_name}", 
-                                   tool_name=tool_name, tool_args=tool_args))
-                
-                # 执行工具
-                result = self.tool_server.call_tool(tool_name, tool_args)
+                for tool_call in batch:
+                    on_message(Message("tool_call", f"调用 {tool_call.get('name', '')}",
+                                       tool_name=tool_call.get("name", ""),
+                                       tool_args=tool_call.get("input", {})))
                 
-                # 显示结果
-                on_message(Message("tool_result", result.message,
-                                   tool_name=tool_name))
+                # 执行工具（同批次并发，结果保持原顺序）
+                results = await asyncio.gather(*[
+                    self._run_tool(tool_call, on_message) for tool_call in batch
+                ])
                 
-                tool_results.append({
-                    "type": "tool_result",
-                    "tool_use_id": tool_id,
-                    "content": result.message
-                })
+                for tool_call, result in zip(batch, results):
+                    # 显示结果
+                    on_message(Message("tool_result", result.message,
+                                       tool_name=tool_call.get("name", "")))
+                    
+                    tool_results.append({
+                        "type": "tool_result",
+                        "tool_use_id": tool_call.get("id", ""),
+                        "content": result.message
+                    })
             
             # 添加工具结果到消息
             if tool_results:
-                self.messages.append({
+                self._push_message({
                     "role": "user",
                     "content": tool_results
                 })
     
+    def _push_message(self, message: dict):
+        """追加一条对话消息，同时缓存其 JSON 序列化结果"""
+        self.messages.append(message)
+        self._messages_json.append(_json_dumps(message))
+    
+    def _batch_tool_calls(self, tool_calls: list) -> List[list]:
+        """将工具调用按顺序分批：连续的并发安全工具（且不重名）合为一批，其余单独成批"""
+        batches = []
+        current = []
+        for tool_call in tool_calls:
+            name = tool_call.get("name", "")
+            safe = self.tool_server.is_concurrency_safe(name)
+            if current and (not safe or any(tc.get("name") == name for tc in current)):
+                batches.append(current)
+                current = []
+            if safe:
+                current.append(tool_call)
+            else:
+                batches.append([tool_call])
+        if current:
+            batches.append(current)
+        return batches
+    
+    async def _run_tool(self, tool_call: dict,
+                        on_message: Callable[[Message], None]) -> ToolResult:
+        """在线程池中执行工具（call_tool 为同步阻塞调用），运行输出以 tool_progress 消息实时转发"""
+        tool_name = tool_call.get("name", "")
+        
+        def on_progress(line: str):
+            on_message(Message("tool_progress", line, tool_name=tool_name))
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self.tool_server.call_tool,
+            tool_name, tool_call.get("input", {}), on_progress
+        )
+    
+    def _get_static_body_prefix(self) -> bytes:
+        """获取预序列化的请求体前缀: {"model":...,"tools":[...],"messages":"""
+        tools = self.tool_server.get_tools_schema()
+        key = (self.config.model, id(tools))
+        if self._static_body_prefix is None or self._static_body_key != key:
+            static = _json_dumps({
+                "model": self.config.model,
+                "max_tokens": 4096,
+                "system": self.SYSTEM_PROMPT,
+                "tools": tools
+            })
+            self._static_body_prefix = static[:-1] + b',"messages":'
+            self._static_body_key = key
+        return self._static_body_prefix
+    
     async def _call_api(self) -> Optional[dict]:
         """调用 API"""
         url = f"{self.config.base_url.rstrip('/')}/v1/messages"
         
-        headers = {
-            "Content-Type": "application/json",
-            "x-api-key": self.config.api_key,
-            "anthropic-version": "2023-06-01"
-        }
+        # 静态部分与历史消息均已序列化，只需拼接
+        body = b"".join((
+            self._get_static_body_prefix(),
+            b"[", b",".join(self._messages_json), b"]}"
+        ))
         
-        payload = {
-            "model": self.config.model,
-            "max_tokens": 4096,
-            "system": self.SYSTEM_PROMPT,
-            "messages": self.messages,
-            "tools": self.tool_server.get_tools_schema()
-        }
+        response = await self._get_http().post(url, content=body)
         
-        async with httpx.AsyncClient(timeout=120) as client:
-            response = await client.post(url, headers=headers, json=payload)
-            
-            if response.status_code != 200:
-                error_text = response.text
-                raise Exception(f"HTTP {response.status_code}: {error_text}")
-            
-            return response.json()
+        if response.status_code != 200:
+            error_text = response.text
+            raise Exception(f"HTTP {response.status_code}: {error_text}")
+        
+        return response.json()
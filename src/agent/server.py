@@ -3,10 +3,87 @@ MCP Server - SysY 编译器工具定义
 """
 import subprocess
 import os
+import re
+import shutil
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Callable, List, Optional, Tuple
 from dataclasses import dataclass
 
+from ..utils import write_file_atomic
+
+
+# 匹配输入数据中的整数（包括负数）
+_INT_PATTERN = re.compile(r'-?\d+')
+
+# JVM 启动加速参数：串行 GC 省去并发 GC 线程的初始化，共享类数据 (CDS) 加速类加载
+_JVM_FAST_START_ARGS = ["-XX:+UseSerialGC", "-Xshare:auto"]
+# 编译器是短任务，只用 C1 编译即可，避免 C2 预热开销
+_JVM_SHORT_TASK_ARGS = _JVM_FAST_START_ARGS + ["-XX:TieredStopAtLevel=1"]
+
+# 结果消息中每段输出最多展示的行数（比较时仍使用完整输出）
+_MAX_DISPLAY_LINES = 10000
+
+
+def _tail_for_display(text: Optional[str]) -> Optional[str]:
+    """只保留最后 _MAX_DISPLAY_LINES 行用于展示，省略的行数写在开头"""
+    if not text:
+        return text
+    lines = text.splitlines(keepends=True)
+    dropped = len(lines) - _MAX_DISPLAY_LINES
+    if dropped <= 0:
+        return text
+    return f"...(省略前 {dropped} 行)\n" + "".join(lines[dropped:])
+
+
+def _run_streaming(cmd: List[str], input_data: str, timeout: float, cwd: str,
+                   on_line: Optional[Callable[[str], None]] = None,
+                   merge_stderr: bool = False) -> Tuple[int, str]:
+    """运行子进程并逐行读取标准输出，返回 (returncode, output)
+    
+    每读到一行即回调 on_line；返回完整输出（展示前用 _tail_for_display 截断）。
+    超时后杀死进程并抛出 subprocess.TimeoutExpired。
+    """
+    proc = subprocess.Popen(
+        cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT if merge_stderr else subprocess.DEVNULL,
+        text=True, errors="replace", cwd=cwd
+    )
+    timed_out = threading.Event()
+    
+    def kill_on_timeout():
+        timed_out.set()
+        proc.kill()
+    
+    def feed_stdin():
+        try:
+            proc.stdin.write(input_data)
+            proc.stdin.close()
+        except OSError:
+            pass
+    
+    timer = threading.Timer(timeout, kill_on_timeout)
+    timer.start()
+    threading.Thread(target=feed_stdin, daemon=True).start()
+    
+    lines = []
+    try:
+        for line in proc.stdout:
+            lines.append(line)
+            if on_line:
+                on_line(line.rstrip("\n"))
+        proc.wait()
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+    
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    
+    return proc.returncode, "".join(lines)
+
 
 @dataclass
 class ToolResult:
@@ -19,6 +96,86 @@ class ToolResult:
 class SysYToolServer:
     """SysY 编译器工具服务器（本地调用版本）"""
     
+    # 可与同批次其他工具并发执行的工具（各自只写入独立的文件）；
+    # run_compiler / save_testcase / discard_case 依赖前序工具的结果，必须串行
+    CONCURRENCY_SAFE_TOOLS = frozenset({"generate_testfile", "generate_input"})
+    
+    # 工具定义（Anthropic 格式），类加载时构建一次，所有请求复用
+    TOOLS_SCHEMA = [
+        {
+            "name": "generate_testfile",
+            "description": "生成 SysY 源代码测试文件。将代码写入临时文件用于后续编译测试。",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "content": {
+                        "type": "string",
+                        "description": "SysY 源代码内容"
+                    }
+                },
+                "required": ["content"]
+            }
+        },
+        {
+            "name": "generate_input",
+            "description": "生成测试输入数据文件。每行一个整数，用于 getint() 函数读取。",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "content": {
+                        "type": "string",
+                        "description": "输入数据，每行一个整数"
+                    }
+                },
+                "required": ["content"]
+            }
+        },
+        {
+            "name": "run_compiler",
+            "description": "调用编译器编译当前的 testfile，检查是否有词法、语法、语义错误。如果编译成功会生成 MIPS 代码并用 Mars 模拟器运行。",
+            "input_schema": {
+                "type": "object",
+                "properties": {},
+                "required": []
+            }
+        },
+        {
+            "name": "save_testcase",
+            "description": "将当前生成的测试用例保存到指定的测试库中。",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "lib_name": {
+                        "type": "string",
+                        "description": "测试库名称"
+                    },
+                    "test_number": {
+                        "type": "integer",
+                        "description": "测试用例编号"
+                    }
+                },
+                "required": ["lib_name", "test_number"]
+            }
+        },
+        {
+            "name": "discard_case",
+            "description": "放弃当前生成的测试用例，清理临时文件。",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "reason": {
+                        "type": "string",
+                        "description": "放弃原因"
+                    }
+                },
+                "required": ["reason"]
+            }
+        }
+    ]
+    
+    # g++ 参考程序缓存保留的最大数量（按最近使用时间淘汰）
+    GCC_CACHE_SIZE = 32
+    
     def __init__(self, test_dir: Path, compiler_jar: Path, mars_jar: Path, 
                  java_cmd: str = "java", gcc_cmd: str = "g++", c_header: str = ""):
         self.test_dir = Path(test_dir)
@@ -32,92 +189,39 @@ class SysYToolServer:
         self.work_dir = self.test_dir / ".tmp" / "agent_work"
         self.work_dir.mkdir(parents=True, exist_ok=True)
         
+        # g++ 编译产物缓存目录（按源码哈希复用）
+        self._gcc_cache_dir = self.work_dir / "gcc_cache"
+        
         # 当前生成的文件
         self.current_testfile: Optional[Path] = None
         self.current_input: Optional[Path] = None
+        # 与上面文件内容一致的内存副本，运行时无需再读盘
+        self._current_source: Optional[str] = None
+        self._current_input_data = ""
     
     def get_tools_schema(self) -> list:
         """获取工具定义（Anthropic 格式）"""
-        return [
-            {
-                "name": "generate_testfile",
-                "description": "生成 SysY 源代码测试文件。将代码写入临时文件用于后续编译测试。",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "content": {
-                            "type": "string",
-                            "description": "SysY 源代码内容"
-                        }
-                    },
-                    "required": ["content"]
-                }
-            },
-            {
-                "name": "generate_input",
-                "description": "生成测试输入数据文件。每行一个整数，用于 getint() 函数读取。",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "content": {
-                            "type": "string",
-                            "description": "输入数据，每行一个整数"
-                        }
-                    },
-                    "required": ["content"]
-                }
-            },
-            {
-                "name": "run_compiler",
-                "description": "调用编译器编译当前的 testfile，检查是否有词法、语法、语义错误。如果编译成功会生成 MIPS 代码并用 Mars 模拟器运行。",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            },
-            {
-                "name": "save_testcase",
-                "description": "将当前生成的测试用例保存到指定的测试库中。",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "lib_name": {
-                            "type": "string",
-                            "description": "测试库名称"
-                        },
-                        "test_number": {
-                            "type": "integer",
-                            "description": "测试用例编号"
-                        }
-                    },
-                    "required": ["lib_name", "test_number"]
-                }
-            },
-            {
-                "name": "discard_case",
-                "description": "放弃当前生成的测试用例，清理临时文件。",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "reason": {
-                            "type": "string",
-                            "description": "放弃原因"
-                        }
-                    },
-                    "required": ["reason"]
-                }
-            }
-        ]
+        return self.TOOLS_SCHEMA
     
-    def call_tool(self, name: str, arguments: dict) -> ToolResult:
-        """调用工具"""
+    def is_concurrency_safe(self, name: str) -> bool:
+        """工具是否可以与其他安全工具并发执行"""
+        return name in self.CONCURRENCY_SAFE_TOOLS
+    
+    def call_tool(self, name: str, arguments: dict,
+                  progress_callback: Optional[Callable[[str], None]] = None) -> ToolResult:
+        """调用工具
+        
+        Args:
+            name: 工具名
+            arguments: 工具参数
+            progress_callback: 长时间运行的工具（run_compiler）逐行回调子进程输出
+        """
         if name == "generate_testfile":
             return self._generate_testfile(arguments.get("content", ""))
         elif name == "generate_input":
             return self._generate_input(arguments.get("content", ""))
         elif name == "run_compiler":
-            return self._run_compiler()
+            return self._run_compiler(progress_callback)
         elif name == "save_testcase":
             return self._save_testcase(
                 arguments.get("lib_name", ""),
@@ -135,8 +239,8 @@ class SysYToolServer:
         
         self.current_testfile = self.work_dir / "testfile.txt"
         try:
-            with open(self.current_testfile, "w", encoding="utf-8", newline="\n") as f:
-                f.write(content)
+            write_file_atomic(self.current_testfile, content)
+            self._current_source = content
             lines = len(content.strip().split('\n'))
             return ToolResult(True, f"✓ 已生成 testfile.txt ({lines} 行)")
         except Exception as e:
@@ -149,38 +253,28 @@ class SysYToolServer:
         if not content.strip():
             # 空输入
             try:
-                with open(self.current_input, "w", encoding="utf-8", newline="\n") as f:
-                    f.write("")
+                write_file_atomic(self.current_input, "")
+                self._current_input_data = ""
                 return ToolResult(True, "✓ 已生成 input.txt (无输入)")
             except Exception as e:
                 return ToolResult(False, f"写入文件失败: {e}")
         
-        # 解析所有整数
-        import re
-        integers = []
-        
-        # 匹配所有整数（包括负数）
-        matches = re.findall(r'-?\d+', content)
-        for match in matches:
-            try:
-                integers.append(int(match))
-            except ValueError:
-                pass
+        # 解析所有整数（包括负数），每行一个
+        integers = _INT_PATTERN.findall(content)
         
         if not integers:
             return ToolResult(False, f"无法从输入中解析出整数: {content[:100]}")
         
-        # 每行一个整数
-        formatted_content = '\n'.join(str(n) for n in integers)
+        formatted_content = '\n'.join(str(int(m)) for m in integers)
         
         try:
-            with open(self.current_input, "w", encoding="utf-8", newline="\n") as f:
-                f.write(formatted_content)
+            write_file_atomic(self.current_input, formatted_content)
+            self._current_input_data = formatted_content
             return ToolResult(True, f"✓ 已生成 input.txt ({len(integers)} 个整数，每行一个)")
         except Exception as e:
             return ToolResult(False, f"写入文件失败: {e}")
     
-    def _run_compiler(self) -> ToolResult:
+    def _run_compiler(self, progress_callback: Optional[Callable[[str], None]] = None) -> ToolResult:
         """运行编译器"""
         if not self.current_testfile or not self.current_testfile.exists():
             return ToolResult(False, "请先生成 testfile")
@@ -195,16 +289,16 @@ class SysYToolServer:
         # 1. 运行编译器
         compiler_output = ""
         try:
-            cmd = [self.java_cmd, "-jar", str(self.compiler_jar)]
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, errors="replace",
-                timeout=30, cwd=str(self.work_dir)
+            cmd = [self.java_cmd, *_JVM_SHORT_TASK_ARGS, "-jar", str(self.compiler_jar)]
+            returncode, compiler_output = _run_streaming(
+                cmd, "", timeout=30, cwd=str(self.work_dir),
+                on_line=progress_callback, merge_stderr=True
             )
             
-            compiler_output = (result.stdout + result.stderr).strip()
+            compiler_output = _tail_for_display(compiler_output.strip())
             
-            if result.returncode != 0:
-                error_msg = f"编译器返回错误 (code {result.returncode})"
+            if returncode != 0:
+                error_msg = f"编译器返回错误 (code {returncode})"
                 if compiler_output:
                     error_msg += f"\n\n【编译器输出】\n{compiler_output}"
                 return ToolResult(False, error_msg)
@@ -220,56 +314,27 @@ class SysYToolServer:
         except Exception as e:
             return ToolResult(False, f"编译器执行失败: {e}")
         
-        # 2. 运行 Mars
-        mars_output = ""
-        try:
-            input_data = ""
-            if self.current_input and self.current_input.exists():
-                input_data = self.current_input.read_text(encoding='utf-8')
-            
-            mars_cmd = [self.java_cmd, "-jar", str(self.mars_jar), "nc", str(mips_path)]
-            mars_result = subprocess.run(
-                mars_cmd, input=input_data, capture_output=True, text=True, errors="replace",
-                timeout=10, cwd=str(self.work_dir)
-            )
-            
-            mars_output = mars_result.stdout
-            
-        except subprocess.TimeoutExpired:
-            return ToolResult(False, "Mars 执行超时（可能存在死循环）")
-        except Exception as e:
-            return ToolResult(False, f"Mars 执行失败: {e}")
+        input_data = self._current_input_data
         
-        # 3. 运行 g++ 对比
-        gcc_output = None
-        try:
-            tmp_src = self.work_dir / "tmp_test.c"
-            tmp_exe = self.work_dir / "tmp_test.exe"
+        # 2. 运行 Mars，同时在后台线程运行 g++ 对比（两者互不依赖）
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            gcc_future = pool.submit(self._run_gcc, input_data)
             
-            source_code = self.current_testfile.read_text(encoding='utf-8')
-            full_code = self.c_header + source_code
-            with open(tmp_src, "w", encoding="utf-8", newline="\n") as f:
-                f.write(full_code)
-            
-            compile_result = subprocess.run(
-                [self.gcc_cmd, str(tmp_src), "-o", str(tmp_exe)],
-                capture_output=True, text=True, errors="replace", timeout=30
-            )
-            
-            if compile_result.returncode == 0:
-                run_result = subprocess.run(
-                    [str(tmp_exe)], input=input_data, capture_output=True, text=True, errors="replace",
-                    timeout=10
+            mars_output = ""
+            try:
+                mars_cmd = [self.java_cmd, *_JVM_FAST_START_ARGS, "-jar", str(self.mars_jar), "nc", str(mips_path)]
+                _, mars_output = _run_streaming(
+                    mars_cmd, input_data, timeout=10, cwd=str(self.work_dir),
+                    on_line=progress_callback
                 )
-                gcc_output = run_result.stdout
+                
+            except subprocess.TimeoutExpired:
+                return ToolResult(False, "Mars 执行超时（可能存在死循环）")
+            except Exception as e:
+                return ToolResult(False, f"Mars 执行失败: {e}")
             
-            # 清理
-            for f in [tmp_src, tmp_exe]:
-                if f.exists():
-                    f.unlink()
-                    
-        except Exception:
-            pass
+            # 3. 等待 g++ 结果
+            gcc_output = gcc_future.result()
         
         # 构建结果
         result_msg = "✓ 编译成功！\n"
@@ -278,26 +343,95 @@ class SysYToolServer:
         if compiler_output:
             result_msg += f"\n【编译器输出】\n{compiler_output}\n"
         
-        result_msg += f"\n【Mars 输出】\n{mars_output if mars_output else '(无输出)'}\n"
+        # 比较使用完整输出，展示时截断
+        mars_display = _tail_for_display(mars_output)
+        gcc_display = _tail_for_display(gcc_output)
+        
+        result_msg += f"\n【Mars 输出】\n{mars_display if mars_display else '(无输出)'}\n"
         
         if gcc_output is not None:
-            result_msg += f"\n【g++ 输出】\n{gcc_output if gcc_output else '(无输出)'}\n"
+            result_msg += f"\n【g++ 输出】\n{gcc_display if gcc_display else '(无输出)'}\n"
             
-            # 比较输出
-            mars_lines = mars_output.strip().split('\n') if mars_output.strip() else []
-            gcc_lines = gcc_output.strip().split('\n') if gcc_output.strip() else []
+            # 比较输出（整串比较，不一致时才统计行数）
+            mars_text = mars_output.strip()
+            gcc_text = gcc_output.strip()
             
-            if mars_lines == gcc_lines:
+            if mars_text == gcc_text:
                 result_msg += "\n✓ 输出一致！"
             else:
-                result_msg += f"\n⚠ 输出不一致！Mars {len(mars_lines)} 行，g++ {len(gcc_lines)} 行"
+                mars_count = mars_text.count('\n') + 1 if mars_text else 0
+                gcc_count = gcc_text.count('\n') + 1 if gcc_text else 0
+                result_msg += f"\n⚠ 输出不一致！Mars {mars_count} 行，g++ {gcc_count} 行"
         
         return ToolResult(True, result_msg, {
             "compiler_output": compiler_output,
-            "mars_output": mars_output,
-            "gcc_output": gcc_output
+            "mars_output": mars_display,
+            "gcc_output": gcc_display
         })
     
+    def _run_gcc(self, input_data: str) -> Optional[str]:
+        """使用 g++ 编译运行当前 testfile，返回标准输出（失败返回 None）
+        
+        编译产物按 (g++ 命令 + 头文件 + 源码) 的哈希缓存，源码未变时直接复用。
+        """
+        gcc_output = None
+        try:
+            source_code = self._current_source
+            full_code = self.c_header + source_code
+            
+            key = hashlib.sha256(f"{self.gcc_cmd}\0{full_code}".encode("utf-8")).hexdigest()
+            exe_path = self._gcc_cache_dir / f"{key}.exe"
+            
+            if exe_path.exists():
+                # 更新 mtime，作为 LRU 淘汰依据
+                os.utime(exe_path)
+            else:
+                self._gcc_cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp_src = self._gcc_cache_dir / f"{key}.c"
+                tmp_exe = self._gcc_cache_dir / f"{key}.tmp.exe"
+                tmp_src.write_bytes(full_code.encode("utf-8"))
+                
+                try:
+                    compile_result = subprocess.run(
+                        [self.gcc_cmd, str(tmp_src), "-o", str(tmp_exe)],
+                        capture_output=True, text=True, errors="replace", timeout=30
+                    )
+                    if compile_result.returncode != 0:
+                        return None
+                    # 先编译到临时文件再替换，避免中断时留下损坏的缓存
+                    os.replace(tmp_exe, exe_path)
+                finally:
+                    # 清理
+                    for f in [tmp_src, tmp_exe]:
+                        if f.exists():
+                            f.unlink()
+                
+                self._evict_gcc_cache()
+            
+            run_result = subprocess.run(
+                [str(exe_path)], input=input_data, capture_output=True, text=True, errors="replace",
+                timeout=10
+            )
+            gcc_output = run_result.stdout
+                    
+        except Exception:
+            pass
+        
+        return gcc_output
+    
+    def _evict_gcc_cache(self):
+        """淘汰最久未使用的 g++ 缓存，保留 GCC_CACHE_SIZE 个"""
+        try:
+            cached = sorted(
+                self._gcc_cache_dir.glob("*.exe"),
+                key=lambda p: p.stat().st_mtime,
+                reverse=True
+            )
+            for stale in cached[self.GCC_CACHE_SIZE:]:
+                stale.unlink()
+        except OSError:
+            pass
+    
     def _save_testcase(self, lib_name: str, test_number: int) -> ToolResult:
         """保存测试用例"""
         if not lib_name:
@@ -311,16 +445,12 @@ class SysYToolServer:
         
         # 保存 testfile
         dest_testfile = lib_path / f"testfile{test_number}.txt"
-        content = self.current_testfile.read_text(encoding='utf-8')
-        with open(dest_testfile, "w", encoding="utf-8", newline="\n") as f:
-            f.write(content)
+        shutil.copyfile(self.current_testfile, dest_testfile)
         
         # 保存 input
         if self.current_input and self.current_input.exists():
             dest_input = lib_path / f"input{test_number}.txt"
-            input_content = self.current_input.read_text(encoding='utf-8')
-            with open(dest_input, "w", encoding="utf-8", newline="\n") as f:
-                f.write(input_content)
+            shutil.copyfile(self.current_input, dest_input)
         
         return ToolResult(True, f"✓ 已保存到 {lib_name}/testfile{test_number}.txt")
     
@@ -333,5 +463,7 @@ class SysYToolServer:
         
         self.current_testfile = None
         self.current_input = None
+        self._current_source = None
+        self._current_input_data = ""
         
         return ToolResult(True, f"已放弃当前用例。原因: {reason}")
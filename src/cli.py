@@ -3,6 +3,8 @@
 """
 import argparse
 import sys
+import threading
+import time
 from pathlib import Path
 from typing import List, Optional
 
@@ -35,16 +37,51 @@ def _format_output(label: str, message: str) -> str:
     return f"[{label}] {message}"
 
 
-def _print_failure_detail(case_name: str, result: TestResult):
-    print(_format_output("FAIL", f"{case_name} - {result.status.value} {result.message}".strip()), flush=True)
+def _format_failure_detail(case_name: str, result: TestResult) -> List[str]:
+    lines = [_format_output("FAIL", f"{case_name} - {result.status} {result.message}".strip())]
     if result.actual_output is not None:
-        print("  实际输出:", flush=True)
-        for line in (result.actual_output or "").splitlines():
-            print(f"    {line}", flush=True)
+        lines.append("  实际输出:")
+        lines.extend(f"    {line}" for line in (result.actual_output or "").splitlines())
     if result.expected_output is not None:
-        print("  期望输出:", flush=True)
-        for line in (result.expected_output or "").splitlines():
-            print(f"    {line}", flush=True)
+        lines.append("  期望输出:")
+        lines.extend(f"    {line}" for line in (result.expected_output or "").splitlines())
+    return lines
+
+
+class _BufferedConsole:
+    """批量写入标准输出：攒够一定字节数或间隔一定时间才 flush 一次"""
+    
+    def __init__(self, max_chars: int = 4096, max_delay: float = 0.1):
+        self._parts: List[str] = []
+        self._size = 0
+        self._max_chars = max_chars
+        self._max_delay = max_delay
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def write_lines(self, lines: List[str]):
+        text = "\n".join(lines) + "\n"
+        with self._lock:
+            self._parts.append(text)
+            self._size += len(text)
+            if self._size >= self._max_chars or time.monotonic() - self._last_flush >= self._max_delay:
+                self._flush_locked()
+    
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+    
+    def _flush_locked(self):
+        if self._parts:
+            sys.stdout.write("".join(self._parts))
+            self._parts.clear()
+            self._size = 0
+        sys.stdout.flush()
+        self._last_flush = time.monotonic()
+
+
+def _matches_any(name: str, patterns: tuple) -> bool:
+    return any(p in name for p in patterns)
 
 
 def run_cli(
@@ -78,15 +115,17 @@ def run_cli(
     libs = TestDiscovery.discover_test_libs(testfiles_dir)
     cases: List = []
     for lib in libs:
-        rel = lib.relative_to(testfiles_dir)
-        for case in TestDiscovery.discover_in_dir(lib):
-            case.name = f"{rel}/{case.name}"
-            cases.append(case)
+        prefix = f"{lib.relative_to(testfiles_dir)}/"
+        lib_cases = TestDiscovery.discover_in_dir(lib)
+        for case in lib_cases:
+            case.name = prefix + case.name
+        cases.extend(lib_cases)
 
     if match:
-        lowered = [m.lower() for m in match if m]
-        if lowered:
-            cases = [c for c in cases if any(m in c.name.lower() for m in lowered)]
+        # 去重并预先转小写，每个用例名只转换一次
+        patterns = tuple(dict.fromkeys(m.lower() for m in match if m))
+        if patterns:
+            cases = [c for c in cases if _matches_any(c.name.lower(), patterns)]
 
     if not cases:
         print(_format_output("WARN", "未发现测试用例"))
@@ -99,6 +138,8 @@ def run_cli(
     failed = 0
     total = len(cases)
     
+    console = _BufferedConsole()
+    
     def on_result(case, result, progress):
         nonlocal passed, failed
         if result.passed:
@@ -109,13 +150,17 @@ def run_cli(
             if show_cycle and result.cycle is not None:
                 extra_parts.append(f"cycle={result.cycle}")
             suffix = f" ({', '.join(extra_parts)})" if extra_parts else ""
-            print(_format_output("PASS", case.name + suffix), flush=True)
+            lines = [_format_output("PASS", case.name + suffix)]
         else:
             failed += 1
-            _print_failure_detail(case.name, result)
-        print(_format_output("INFO", f"进度: {passed + failed}/{total} ({progress:.1f}%)"), flush=True)
+            lines = _format_failure_detail(case.name, result)
+        lines.append(_format_output("INFO", f"进度: {passed + failed}/{total} ({progress:.1f}%)"))
+        console.write_lines(lines)
     
-    tester.test_parallel(cases, max_workers=config.parallel.max_workers, callback=on_result)
+    try:
+        tester.test_parallel(cases, max_workers=config.parallel.max_workers, callback=on_result)
+    finally:
+        console.flush()
     
     print(_format_output("INFO", f"完成: {passed} 通过, {failed} 失败, 共 {total}"))
     return 0 if failed == 0 else 1
@@ -1,15 +1,54 @@
 """
 配置模块 - 从YAML文件加载配置
 """
+import copy
+import threading
 import yaml
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
 try:
     import tkinter.font as tkfont
 except Exception:
     tkfont = None
 
+# 默认配置文件路径（仓库根目录下的 config.yaml）
+_DEFAULT_CONFIG_PATH = Path(__file__).resolve().parent.parent / "config.yaml"
+
+# 优先使用 libyaml 实现的 C 加载器，不可用时回落到纯 Python 实现
+# C 加载器可直接读取 UTF-8 字节流，省去 Python 层的解码
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_BINARY = _YAML_LOADER is not yaml.SafeLoader
+
+# YAML 解析结果缓存: 路径 -> ((mtime_ns, size), data)，文件未变化时跳过重新解析
+_parse_cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+
+
+def _load_yaml_cached(config_path: Path) -> Any:
+    """解析 YAML 文件，按 mtime+size 缓存结果；返回深拷贝，调用方可随意修改"""
+    st = config_path.stat()
+    stamp = (st.st_mtime_ns, st.st_size)
+    key = str(config_path)
+    cached = _parse_cache.get(key)
+    if cached is None or cached[0] != stamp:
+        if _YAML_BINARY:
+            with open(config_path, 'rb') as f:
+                data = yaml.load(f, Loader=_YAML_LOADER)
+        else:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                data = yaml.load(f, Loader=_YAML_LOADER)
+        cached = (stamp, data)
+        _parse_cache[key] = cached
+    return copy.deepcopy(cached[1])
+
+
+# YAML 中表示"未设置"的写法
+_EMPTY_SENTINELS = frozenset({"none", "null", "~"})
+
+# 全局配置单例；Agent 后台线程也会读取，首次加载与重载需加锁
+_CONFIG_SINGLETON: Optional['Config'] = None
+_CONFIG_LOCK = threading.Lock()
+
 
 @dataclass
 class TimeoutConfig:
@@ -35,6 +74,8 @@ class ToolsConfig:
     jdk_home: str = ""       # JDK安装目录，空则用PATH
     gcc_path: str = ""       # gcc/g++可执行文件路径
     cmake_path: str = ""
+    jvm_fast_startup: bool = True   # 短命 JVM（Mars、Java 编译器）只用 C1 编译
+    mars_cds_archive: str = ""      # Mars 的 AppCDS 归档文件，空则不用
     
     def _normalize(self, value) -> str:
         if value is None:
@@ -42,35 +83,43 @@ class ToolsConfig:
         if not isinstance(value, str):
             value = str(value)
         value = value.strip()
-        if value.lower() in ("none", "null", "~"):
+        if value.casefold() in _EMPTY_SENTINELS:
             return ""
         return value
     
-    def get_java(self) -> str:
+    def __post_init__(self):
+        # 路径在配置生命周期内不变，归一化和拼接只做一次
         jdk_home = self._normalize(self.jdk_home)
         if jdk_home:
-            return str(Path(jdk_home) / "bin" / "java")
-        return "java"
+            jdk_bin = Path(jdk_home) / "bin"
+            self._java = str(jdk_bin / "java")
+            self._javac = str(jdk_bin / "javac")
+            self._jar = str(jdk_bin / "jar")
+        else:
+            self._java = "java"
+            self._javac = "javac"
+            self._jar = "jar"
+        self._gcc = self._normalize(self.gcc_path) or "g++"
+        self._cmake = self._normalize(self.cmake_path) or "cmake"
+        self._mars_cds_archive = self._normalize(self.mars_cds_archive)
+    
+    def get_java(self) -> str:
+        return self._java
     
     def get_javac(self) -> str:
-        jdk_home = self._normalize(self.jdk_home)
-        if jdk_home:
-            return str(Path(jdk_home) / "bin" / "javac")
-        return "javac"
+        return self._javac
     
     def get_jar(self) -> str:
-        jdk_home = self._normalize(self.jdk_home)
-        if jdk_home:
-            return str(Path(jdk_home) / "bin" / "jar")
-        return "jar"
+        return self._jar
     
     def get_gcc(self) -> str:
-        gcc_path = self._normalize(self.gcc_path)
-        return gcc_path if gcc_path else "g++"
+        return self._gcc
     
     def get_cmake(self) -> str:
-        cmake_path = self._normalize(self.cmake_path)
-        return cmake_path if cmake_path else "cmake"
+        return self._cmake
+    
+    def get_mars_cds_archive(self) -> str:
+        return self._mars_cds_archive
 
 
 @dataclass
@@ -82,24 +131,37 @@ class GuiConfig:
     font_size: int = 10
     _resolved_font: Optional[str] = field(default=None, repr=False)
     
+    # 所有 GuiConfig 实例共享的字体解析结果: 候选字体元组 -> 可用字体
+    _font_cache: ClassVar[Dict[Tuple[str, ...], str]] = {}
+    
     def get_font(self) -> str:
         """获取可用的字体（自动回落）"""
         if self._resolved_font:
             return self._resolved_font
         
+        self._resolved_font = self._resolve_font(tuple(self.font_family))
+        return self._resolved_font
+    
+    @classmethod
+    def _resolve_font(cls, families: Tuple[str, ...]) -> str:
+        """在系统字体中查找第一个可用的候选字体（tkfont.families() 较慢，结果跨实例缓存）"""
+        cached = cls._font_cache.get(families)
+        if cached is not None:
+            return cached
+        
+        # 默认回落
+        fallback = families[-1] if families else "TkFixedFont"
         try:
             if tkfont is not None:
                 available = set(tkfont.families())
-                for font in self.font_family:
-                    if font in available:
-                        self._resolved_font = font
-                        return font
+                resolved = next((font for font in families if font in available), fallback)
+                # 只缓存成功查询的结果（Tk 未初始化时查询会失败）
+                cls._font_cache[families] = resolved
+                return resolved
         except Exception:
             pass
         
-        # 默认回落
-        self._resolved_font = self.font_family[-1] if self.font_family else "TkFixedFont"
-        return self._resolved_font
+        return fallback
 
 
 @dataclass
@@ -120,21 +182,18 @@ class Config:
     tools: ToolsConfig = field(default_factory=ToolsConfig)
     gui: GuiConfig = field(default_factory=GuiConfig)
     
-    _instance: Optional['Config'] = field(default=None, repr=False, init=False)
-    
     @classmethod
     def load(cls, config_path: Optional[Path] = None) -> 'Config':
         """加载配置文件"""
         if config_path is None:
-            config_path = Path(__file__).parent.parent / "config.yaml"
+            config_path = _DEFAULT_CONFIG_PATH
         
         if not config_path.exists():
             print(f"配置文件不存在: {config_path}，使用默认配置")
             return cls._create_default()
         
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            data = _load_yaml_cached(config_path)
             return cls._from_dict(data)
         except Exception as e:
             print(f"加载配置文件失败: {e}，使用默认配置")
@@ -175,7 +234,9 @@ class Config:
         tools = ToolsConfig(
             jdk_home=tools_data.get('jdk_home', ''),
             gcc_path=tools_data.get('gcc_path', ''),
-            cmake_path=tools_data.get('cmake_path', '')
+            cmake_path=tools_data.get('cmake_path', ''),
+            jvm_fast_startup=bool(tools_data.get('jvm_fast_startup', True)),
+            mars_cds_archive=tools_data.get('mars_cds_archive', '')
         )
         
         return cls(
@@ -231,15 +292,22 @@ int getint() {
     @classmethod
     def get(cls) -> 'Config':
         """获取全局配置实例（单例）"""
-        if cls._instance is None:
-            cls._instance = cls.load()
-        return cls._instance
+        global _CONFIG_SINGLETON
+        instance = _CONFIG_SINGLETON
+        if instance is None:
+            with _CONFIG_LOCK:
+                if _CONFIG_SINGLETON is None:
+                    _CONFIG_SINGLETON = cls.load()
+                instance = _CONFIG_SINGLETON
+        return instance
     
     @classmethod
     def reload(cls, config_path: Optional[Path] = None) -> 'Config':
         """重新加载配置"""
-        cls._instance = cls.load(config_path)
-        return cls._instance
+        global _CONFIG_SINGLETON
+        with _CONFIG_LOCK:
+            _CONFIG_SINGLETON = cls.load(config_path)
+            return _CONFIG_SINGLETON
 
 
 def get_config() -> Config:
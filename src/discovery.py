@@ -1,9 +1,10 @@
 """
 测试用例发现模块
 """
+import os
 import re
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Iterable, List, Tuple, Optional, Set
 
 from .models import TestCase
 
@@ -34,7 +35,8 @@ class TestDiscovery:
         return None
     
     @staticmethod
-    def _find_input_file(test_dir: Path, num: int, suffix: str) -> Optional[Path]:
+    def _find_input_file(test_dir: Path, num: int, suffix: str,
+                         existing: Optional[Set[str]] = None) -> Optional[Path]:
         """
         查找对应的输入文件
         
@@ -42,30 +44,53 @@ class TestDiscovery:
         1. input_XXX_name.txt (带后缀)
         2. inputXXX.txt (不带下划线)
         3. input{num}.txt (简单格式)
+        
+        existing 为目录下已知的文件名集合时直接查集合，不再逐个 stat
         """
+        def find(name: str) -> Optional[Path]:
+            if existing is not None:
+                return test_dir / name if name in existing else None
+            input_file = test_dir / name
+            return input_file if input_file.exists() else None
+        
         # 格式1: input_000_main.txt
         if suffix:
-            input_file = test_dir / f"input{suffix.lstrip('_')}.txt"
-            if input_file.exists():
+            input_file = find(f"input{suffix.lstrip('_')}.txt")
+            if input_file:
                 return input_file
             # 尝试带序号的格式: input_000_main.txt
-            num_str = str(num)
-            input_file = test_dir / f"input_{num_str}{suffix}.txt"
-            if input_file.exists():
+            input_file = find(f"input_{num}{suffix}.txt")
+            if input_file:
                 return input_file
             # 尝试补零格式
             for width in [2, 3]:
                 padded = str(num).zfill(width)
-                input_file = test_dir / f"input_{padded}{suffix}.txt"
-                if input_file.exists():
+                input_file = find(f"input_{padded}{suffix}.txt")
+                if input_file:
                     return input_file
         
         # 格式2: input1.txt (简单格式)
-        input_file = test_dir / f"input{num}.txt"
-        if input_file.exists():
-            return input_file
+        return find(f"input{num}.txt")
+    
+    @staticmethod
+    def _cases_from_names(test_dir: Path, names: Iterable[str]) -> List[TestCase]:
+        """根据目录下的文件名列表构造测试用例（按序号排序）"""
+        existing = set(names)
+        file_cases = []
+        for name in existing:
+            parsed = TestDiscovery._parse_testfile_name(name)
+            if parsed:
+                num, suffix = parsed
+                input_file = TestDiscovery._find_input_file(test_dir, num, suffix, existing)
+                file_cases.append((num, name, TestCase(
+                    name=name,
+                    testfile=test_dir / name,
+                    input_file=input_file
+                )))
         
-        return None
+        # 集合无序，序号相同时再按文件名排，保证结果稳定
+        file_cases.sort(key=lambda x: x[:2])
+        return [tc for _, _, tc in file_cases]
     
     @staticmethod
     def discover_in_dir(test_dir: Path) -> List[TestCase]:
@@ -120,6 +145,35 @@ class TestDiscovery:
         
         return test_libs
     
+    @staticmethod
+    def discover_all(testfiles_dir: Path) -> List[Tuple[Path, List[TestCase]]]:
+        """
+        一次遍历发现所有测试库及其用例，返回 [(库目录, 用例列表), ...]
+        库的判定与顺序同 discover_test_libs；每个目录只 scandir 一次
+        """
+        result = []
+        
+        if not testfiles_dir.exists():
+            return result
+        
+        def walk(directory: Path):
+            with os.scandir(directory) as it:
+                entries = list(it)
+            file_names = [e.name for e in entries if e.is_file()]
+            
+            if any(n.startswith("testfile") and n.endswith(".txt") for n in file_names):
+                result.append((directory, TestDiscovery._cases_from_names(directory, file_names)))
+            else:
+                for name in sorted(e.name for e in entries if e.is_dir()):
+                    walk(directory / name)
+        
+        with os.scandir(testfiles_dir) as it:
+            top_dirs = sorted(e.name for e in it if e.is_dir())
+        for name in top_dirs:
+            walk(testfiles_dir / name)
+        
+        return result
+    
     @staticmethod
     def get_next_testfile_number(test_dir: Path) -> int:
         """获取下一个测试文件编号"""
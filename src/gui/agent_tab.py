@@ -5,13 +5,18 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import asyncio
 import threading
-import queue
+from collections import deque
 import json
 from pathlib import Path
 from typing import TYPE_CHECKING, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .base import BaseTab
-from .theme import COLORS, create_styled_text
+from .theme import FONT_HEADER, create_styled_text, chat_tag_styles
 from .widgets import IconButton
 from ..agent.server import SysYToolServer
 from ..agent.client import AgentClient, AgentConfig, Message
@@ -20,6 +25,26 @@ if TYPE_CHECKING:
     from .app import TestApp
 
 
+# 聊天消息标签 -> 前缀
+_PREFIX_MAP = {
+    "user": "👤 你: ",
+    "assistant": "🤖 AI: ",
+    "system": "⚙️ ",
+    "tool_call": "🔧 ",
+    "tool_result": "📋 ",
+    "error": "❌ ",
+}
+
+
+def _format_tool_args(tool_args: Optional[dict]) -> str:
+    """格式化工具调用参数用于显示"""
+    if not tool_args:
+        return ""
+    if orjson is not None:
+        return orjson.dumps(tool_args, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(tool_args, ensure_ascii=False, indent=2)
+
+
 class AgentTab(BaseTab):
     """AI Agent 测试用例生成标签页"""
     
@@ -27,9 +52,11 @@ class AgentTab(BaseTab):
         super().__init__(parent, app)
         self.agent_client: Optional[AgentClient] = None
         self.tool_server: Optional[SysYToolServer] = None
-        self.message_queue = queue.Queue()
+        # 单生产者（Agent 线程）单消费者（Tk 主线程），deque 的 append/popleft 本身线程安全
+        self.message_queue: deque = deque()
         self.is_running = False
         self.agent_config: Optional[AgentConfig] = None
+        self._agent_config_key: Optional[tuple] = None
     
     def build(self):
         """构建界面"""
@@ -83,7 +110,7 @@ class AgentTab(BaseTab):
         # 标题栏
         header = ttk.Frame(chat_frame)
         header.pack(fill=tk.X, pady=(0, 6))
-        ttk.Label(header, text="🤖 AI 对话", font=('微软雅黑', 10, 'bold')).pack(side=tk.LEFT)
+        ttk.Label(header, text="🤖 AI 对话", font=FONT_HEADER).pack(side=tk.LEFT)
         
         self.status_label = ttk.Label(header, text="", style='Status.TLabel')
         self.status_label.pack(side=tk.LEFT, padx=(12, 0))
@@ -142,16 +169,9 @@ class AgentTab(BaseTab):
     
     def _setup_chat_tags(self):
         """设置聊天标签样式"""
-        self.chat_text.tag_configure('user', foreground=COLORS['info'],
-                                      font=(self.config.gui.get_font(), self.config.gui.font_size, 'bold'))
-        self.chat_text.tag_configure('assistant', foreground=COLORS['fg_primary'])
-        self.chat_text.tag_configure('system', foreground=COLORS['fg_muted'],
-                                      font=(self.config.gui.get_font(), self.config.gui.font_size - 1))
-        self.chat_text.tag_configure('tool_call', foreground=COLORS['warning'],
-                                      font=(self.config.gui.get_font(), self.config.gui.font_size - 1))
-        self.chat_text.tag_configure('tool_result', foreground=COLORS['success'],
-                                      background=COLORS['bg_tertiary'])
-        self.chat_text.tag_configure('error', foreground=COLORS['error'])
+        styles = chat_tag_styles(self.config.gui.get_font(), self.config.gui.font_size)
+        for tag, options in styles.items():
+            self.chat_text.tag_configure(tag, **options)
     
     def _toggle_key_visibility(self):
         """切换 API Key 可见性"""
@@ -165,8 +185,11 @@ class AgentTab(BaseTab):
         config_path = self.test_dir / "agent_config.json"
         if config_path.exists():
             try:
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                if orjson is not None:
+                    data = orjson.loads(config_path.read_bytes())
+                else:
+                    with open(config_path, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
                 self.base_url_var.set(data.get("base_url", "https://api.anthropic.com"))
                 self.api_key_var.set(data.get("api_key", ""))
                 self.model_var.set(data.get("model", "claude-sonnet-4-20250514"))
@@ -182,8 +205,11 @@ class AgentTab(BaseTab):
             "model": self.model_var.get()
         }
         try:
-            with open(config_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2)
+            if orjson is not None:
+                config_path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(config_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2)
             self._append_chat("system", "✓ 配置已保存")
         except Exception as e:
             self._append_chat("error", f"保存配置失败: {e}")
@@ -199,24 +225,26 @@ class AgentTab(BaseTab):
     
     def _append_chat(self, tag: str, text: str):
         """添加聊天消息"""
+        self._append_chat_batch([(tag, text)])
+    
+    def _append_chat_batch(self, entries):
+        """批量添加聊天消息 [(tag, text), ...]，只切换一次状态并滚动一次"""
         self.chat_text.config(state=tk.NORMAL)
         
-        prefix = ""
-        if tag == "user":
-            prefix = "👤 你: "
-        elif tag == "assistant":
-            prefix = "🤖 AI: "
-        elif tag == "system":
-            prefix = "⚙️ "
-        elif tag == "tool_call":
-            prefix = "🔧 "
-        elif tag == "tool_result":
-            prefix = "📋 "
-        elif tag == "error":
-            prefix = "❌ "
-        
-        self.chat_text.insert(tk.END, prefix, tag)
-        self.chat_text.insert(tk.END, text + "\n\n", tag)
+        # 连续同标签的消息合并成一次 insert
+        run_tag = None
+        run_parts = []
+        for tag, text in entries:
+            if tag != run_tag and run_parts:
+                self.chat_text.insert(tk.END, "".join(run_parts), run_tag)
+                run_parts = []
+            run_tag = tag
+            run_parts.append(_PREFIX_MAP.get(tag, ""))
+            run_parts.append(text)
+            run_parts.append("\n\n")
+        if run_parts:
+            self.chat_text.insert(tk.END, "".join(run_parts), run_tag)
+        
         self.chat_text.see(tk.END)
         self.chat_text.config(state=tk.DISABLED)
     
@@ -260,9 +288,9 @@ class AgentTab(BaseTab):
                     self.agent_client.chat(message, self._on_agent_message)
                 )
             except Exception as e:
-                self.message_queue.put(("error", str(e)))
+                self.message_queue.append(("error", str(e)))
             finally:
-                self.message_queue.put(("done", None))
+                self.message_queue.append(("done", None))
                 loop.close()
         
         threading.Thread(target=run_agent, daemon=True).start()
@@ -274,12 +302,15 @@ class AgentTab(BaseTab):
             messagebox.showerror("错误", "请先配置 API Key")
             return
         
+        # 配置未变化时直接复用已有的客户端和工具服务器
+        config_key = (self.base_url_var.get(), self.api_key_var.get(), self.model_var.get())
+        if config_key == self._agent_config_key and self.agent_client and self.tool_server:
+            return
+        
         # 创建配置
-        self.agent_config = AgentConfig(
-            base_url=self.base_url_var.get(),
-            api_key=self.api_key_var.get(),
-            model=self.model_var.get()
-        )
+        base_url, api_key, model = config_key
+        self.agent_config = AgentConfig(base_url=base_url, api_key=api_key, model=model)
+        self._agent_config_key = config_key
         
         # 创建工具服务器（只在不存在时创建，保持状态）
         if not self.tool_server:
@@ -310,8 +341,12 @@ class AgentTab(BaseTab):
             self.agent_client.tool_server = self.tool_server
     
     def _on_agent_message(self, msg: Message):
-        """Agent 消息回调"""
-        self.message_queue.put(("message", msg))
+        """Agent 消息回调（在 Agent 线程执行）"""
+        if msg.role == "tool_call":
+            # 参数格式化放在 Agent 线程完成，GUI 线程只负责插入文本
+            self.message_queue.append(("tool_call", f"{msg.content}\n{_format_tool_args(msg.tool_args)}"))
+        else:
+            self.message_queue.append(("message", msg))
     
     def _stop_agent(self):
         """停止 Agent"""
@@ -319,37 +354,41 @@ class AgentTab(BaseTab):
             self.agent_client.stop()
         self.status_label.configure(text="已停止")
     
-    def process_queue(self):
-        """处理消息队列"""
-        try:
-            while True:
-                msg_type, data = self.message_queue.get_nowait()
-                
-                if msg_type == "message":
-                    msg: Message = data
-                    if msg.role == "user":
-                        self._append_chat("user", msg.content)
-                    elif msg.role == "assistant":
-                        self._append_chat("assistant", msg.content)
-                    elif msg.role == "system":
-                        self._append_chat("system", msg.content)
-                    elif msg.role == "tool_call":
-                        args_str = json.dumps(msg.tool_args, ensure_ascii=False, indent=2) if msg.tool_args else ""
-                        self._append_chat("tool_call", f"{msg.content}\n{args_str}")
-                    elif msg.role == "tool_result":
-                        self._append_chat("tool_result", msg.content)
-                
-                elif msg_type == "error":
-                    self._append_chat("error", f"错误: {data}")
+    def process_queue(self) -> bool:
+        """处理消息队列（本轮取出的聊天消息一次性写入），返回本轮是否处理了消息"""
+        entries = []
+        handled = False
+        while self.message_queue:
+            msg_type, data = self.message_queue.popleft()
+            handled = True
+            
+            if msg_type == "message":
+                msg: Message = data
+                if msg.role in ("user", "assistant", "system"):
+                    entries.append((msg.role, msg.content))
+                elif msg.role == "tool_result":
+                    entries.append(("tool_result", msg.content))
+                    self.status_label.configure(text="思考中...")
+                elif msg.role == "tool_progress":
+                    # 工具运行中的实时输出只显示在状态栏，完整结果由 tool_result 展示
+                    self.status_label.configure(text=f"{msg.tool_name}: {msg.content[:80]}")
+            
+            elif msg_type == "tool_call":
+                entries.append(("tool_call", data))
+            
+            elif msg_type == "error":
+                entries.append(("error", f"错误: {data}"))
+            
+            elif msg_type == "done":
+                self.is_running = False
+                self.send_btn.configure(state=tk.NORMAL)
+                self.stop_btn.configure(state=tk.DISABLED)
+                self.status_label.configure(text="")
                 
-                elif msg_type == "done":
-                    self.is_running = False
-                    self.send_btn.configure(state=tk.NORMAL)
-                    self.stop_btn.configure(state=tk.DISABLED)
-                    self.status_label.configure(text="")
-                    
-                    # 刷新测试列表
-                    if hasattr(self.app, 'test_tab') and self.app.test_tab:
-                        self.app.test_tab.refresh_lists()
-        except queue.Empty:
-            pass
+                # 刷新测试列表
+                if hasattr(self.app, 'test_tab') and self.app.test_tab:
+                    self.app.test_tab.mark_lists_dirty()
+        
+        if entries:
+            self._append_chat_batch(entries)
+        return handled
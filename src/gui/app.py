@@ -1,6 +1,7 @@
 """
 主应用类 - 现代化GUI
 """
+import time
 import tkinter as tk
 from tkinter import ttk
 from pathlib import Path
@@ -16,6 +17,11 @@ from .agent_tab import AgentTab
 class TestApp:
     """测试应用GUI - 现代化设计"""
     
+    # 消息队列轮询间隔（毫秒）：有消息或任务运行中时用最短间隔，空闲时逐步放慢到上限
+    POLL_MIN_MS = 10
+    POLL_MAX_MS = 200
+    POLL_BACKOFF = 1.5
+    
     def __init__(self):
         self.config = get_config()
         self.root = tk.Tk()
@@ -46,7 +52,8 @@ class TestApp:
         self._setup()
         
         # 定时检查消息队列
-        self.root.after(50, self._process_queue)
+        self._poll_interval = self.POLL_MAX_MS
+        self.root.after(self._poll_interval, self._process_queue)
         
         # 窗口居中
         self._center_window()
@@ -87,15 +94,23 @@ class TestApp:
         self.editor_tab = EditorTab(editor_frame, self)
         self.editor_tab.build()
         
-        # 标签页3: AI 生成
-        agent_frame = ttk.Frame(self.notebook)
-        self.notebook.add(agent_frame, text="  🤖 AI 生成  ")
-        self.agent_tab = AgentTab(agent_frame, self)
-        self.agent_tab.build()
+        # 标签页3: AI 生成（首次切换到该页时再构建）
+        self._agent_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self._agent_frame, text="  🤖 AI 生成  ")
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
         
         # 状态栏
         self._build_statusbar(main_container)
     
+    def _on_tab_changed(self, event=None):
+        """切换标签页时按需构建 AI 生成页、刷新测试列表"""
+        selected = self.notebook.select()
+        if self.test_tab and selected == str(self.test_tab.parent):
+            self.test_tab.refresh_if_dirty()
+        if self.agent_tab is None and selected == str(self._agent_frame):
+            self.agent_tab = AgentTab(self._agent_frame, self)
+            self.agent_tab.build()
+    
     def _build_header(self, parent):
         """构建标题栏"""
         header = ttk.Frame(parent)
@@ -137,14 +152,15 @@ class TestApp:
             style='Status.TLabel'
         )
         self.time_label.pack(side=tk.RIGHT)
+        self._clock_second = None
         self._update_time()
     
     def _update_time(self):
-        """更新时间显示"""
-        from datetime import datetime
-        now = datetime.now().strftime("%H:%M:%S")
-        self.time_label.configure(text=now)
-        self.root.after(1000, self._update_time)
+        """更新时间显示（由消息队列轮询顺带调用，秒数变化时才重绘）"""
+        second = int(time.time())
+        if second != self._clock_second:
+            self._clock_second = second
+            self.time_label.configure(text=time.strftime("%H:%M:%S", time.localtime(second)))
     
     def update_project_status(self, path: Optional[Path] = None):
         """更新项目状态"""
@@ -159,12 +175,21 @@ class TestApp:
         self.editor_tab.refresh_libs(set_default=True)
     
     def _process_queue(self):
-        """处理消息队列"""
-        if self.test_tab:
-            self.test_tab.process_queue()
-        if self.agent_tab:
-            self.agent_tab.process_queue()
-        self.root.after(50, self._process_queue)
+        """处理消息队列（空闲时降低轮询频率）"""
+        handled = False
+        running = False
+        for tab in (self.test_tab, self.agent_tab):
+            if tab:
+                handled = tab.process_queue() or handled
+                running = running or tab.is_running
+        
+        self._update_time()
+        
+        if handled or running:
+            self._poll_interval = self.POLL_MIN_MS
+        else:
+            self._poll_interval = min(int(self._poll_interval * self.POLL_BACKOFF) + 1, self.POLL_MAX_MS)
+        self.root.after(self._poll_interval, self._process_queue)
     
     def run(self):
         """运行应用"""
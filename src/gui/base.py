@@ -3,12 +3,13 @@ GUI基础组件和工具类
 """
 import tkinter as tk
 from tkinter import ttk
+from itertools import zip_longest
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List, Optional, Tuple
 
 from ..config import get_config, Config
 from ..utils import normalize_output
-from .theme import COLORS
+from .theme import output_tag_styles
 
 if TYPE_CHECKING:
     from .app import TestApp
@@ -34,25 +35,71 @@ class OutputMixin:
     output_text: tk.Text
     config: Config
     
+    # 批量输出缓冲：不为 None 时 _log 只记录，由 _flush_log 一次性写入
+    _log_buffer: Optional[List[Tuple[str, Optional[str]]]] = None
+    _log_flush_id: Optional[str] = None
+    
+    # 延迟写入间隔（毫秒）：测试运行中日志按此节奏合并刷新
+    LOG_FLUSH_MS = 50
+    
     def _setup_output_tags(self):
         """设置输出文本标签样式"""
-        self.output_text.tag_configure('pass', foreground=COLORS['success'])
-        self.output_text.tag_configure('fail', foreground=COLORS['error'])
-        self.output_text.tag_configure('info', foreground=COLORS['info'])
-        self.output_text.tag_configure('warning', foreground=COLORS['warning'])
-        self.output_text.tag_configure('error', foreground=COLORS['error'], 
-            font=(self.config.gui.get_font(), self.config.gui.font_size - 1, 'bold'))
-        self.output_text.tag_configure('header', foreground=COLORS['accent'],
-            font=(self.config.gui.get_font(), self.config.gui.font_size, 'bold'))
-        self.output_text.tag_configure('dim', foreground=COLORS['fg_muted'])
+        styles = output_tag_styles(self.config.gui.get_font(), self.config.gui.font_size)
+        for tag, options in styles.items():
+            self.output_text.tag_configure(tag, **options)
     
     def _log(self, text: str, tag: str = None):
         """输出日志"""
+        if self._log_buffer is not None:
+            self._log_buffer.append((text, tag))
+            return
         self.output_text.config(state=tk.NORMAL)
         self.output_text.insert(tk.END, text + '\n', tag if tag else ())
         self.output_text.see(tk.END)
         self.output_text.config(state=tk.DISABLED)
     
+    def _log_lines(self, entries: List[Tuple[str, Optional[str]]]):
+        """输出多行 (文本, 标签)：批量中直接并入缓冲，否则一次状态切换写完"""
+        if self._log_buffer is not None:
+            self._log_buffer.extend(entries)
+            return
+        self._log_buffer = list(entries)
+        self._flush_log()
+    
+    def _begin_log_batch(self):
+        """开始批量输出，之后的 _log 在 _flush_log 时统一写入"""
+        if self._log_buffer is None:
+            self._log_buffer = []
+    
+    def _schedule_log_flush(self):
+        """保持缓冲，LOG_FLUSH_MS 后统一写入（已有定时则不重复安排）"""
+        if self._log_buffer is None or self._log_flush_id is not None:
+            return
+        self._log_flush_id = self.output_text.after(self.LOG_FLUSH_MS, self._flush_log)
+    
+    def _flush_log(self):
+        """写入批量缓冲的日志：连续同标签的行合并为一次 insert"""
+        if self._log_flush_id is not None:
+            self.output_text.after_cancel(self._log_flush_id)
+            self._log_flush_id = None
+        entries = self._log_buffer
+        self._log_buffer = None
+        if not entries:
+            return
+        
+        self.output_text.config(state=tk.NORMAL)
+        run_tag = None
+        run_lines = []
+        for text, tag in entries:
+            if tag != run_tag and run_lines:
+                self.output_text.insert(tk.END, ''.join(run_lines), run_tag if run_tag else ())
+                run_lines = []
+            run_tag = tag
+            run_lines.append(text + '\n')
+        self.output_text.insert(tk.END, ''.join(run_lines), run_tag if run_tag else ())
+        self.output_text.see(tk.END)
+        self.output_text.config(state=tk.DISABLED)
+    
     def _log_failure(self, name: str, status: str, message: str, 
                      actual: str = None, expected: str = None):
         """美观地输出失败信息
@@ -61,15 +108,16 @@ class OutputMixin:
         - 行长度：期望行长度 + 50 字符后省略
         - 差异行数：期望行数 + 10 行后省略
         """
-        self.output_text.config(state=tk.NORMAL)
+        lines: List[Tuple[str, Optional[str]]] = []
+        log = lines.append
         
         # 分隔线和标题
-        self._log("─" * 50, 'dim')
-        self._log(f"✗ {name}", 'error')
-        self._log(f"  状态: {status}", 'fail')
+        log(("─" * 50, 'dim'))
+        log((f"✗ {name}", 'error'))
+        log((f"  状态: {status}", 'fail'))
         
         if message:
-            self._log(f"  原因: {message}", 'fail')
+            log((f"  原因: {message}", 'fail'))
         
         if actual is not None and expected is not None:
             actual_norm = normalize_output(actual)
@@ -78,25 +126,23 @@ class OutputMixin:
             expected_lines = expected_norm.split('\n')
             
             # 输出行数统计
-            self._log(f"  行数: 实际 {len(actual_lines)} | 期望 {len(expected_lines)}", 'info')
+            log((f"  行数: 实际 {len(actual_lines)} | 期望 {len(expected_lines)}", 'info'))
             
-            # 找出差异行
+            # 找出差异行（省略规则：期望行数 + 10，超出部分只计数不保存）
+            max_diff_lines = len(expected_lines) + 10
             diff_lines = []
-            max_len = max(len(actual_lines), len(expected_lines))
-            for i in range(max_len):
-                a = actual_lines[i] if i < len(actual_lines) else ""
-                e = expected_lines[i] if i < len(expected_lines) else ""
+            diff_count = 0
+            for line_no, (a, e) in enumerate(zip_longest(actual_lines, expected_lines, fillvalue=""), start=1):
                 if a != e:
-                    diff_lines.append((i + 1, a, e))
+                    diff_count += 1
+                    if diff_count <= max_diff_lines:
+                        diff_lines.append((line_no, a, e))
             
             if diff_lines:
-                self._log(f"  差异: {len(diff_lines)} 处", 'warning')
-                
-                # 省略规则：期望行数 + 10
-                max_diff_lines = len(expected_lines) + 10
+                log((f"  差异: {diff_count} 处", 'warning'))
                 
-                for idx, (line_no, actual_line, expected_line) in enumerate(diff_lines[:max_diff_lines]):
-                    self._log(f"  ┌ 第 {line_no} 行", 'dim')
+                for idx, (line_no, actual_line, expected_line) in enumerate(diff_lines):
+                    log((f"  ┌ 第 {line_no} 行", 'dim'))
                     
                     # 省略规则：期望行长度 + 50 字符
                     max_line_len = len(expected_line) + 50
@@ -107,17 +153,19 @@ class OutputMixin:
                     actual_show = "<空>" if actual_line == "" else actual_display
                     expected_show = "<空>" if expected_line == "" else expected_display
                     
-                    self._log(f"  │ 实际: {actual_show}", 'fail')
-                    self._log(f"  └ 期望: {expected_show}", 'pass')
+                    log((f"  │ 实际: {actual_show}", 'fail'))
+                    log((f"  └ 期望: {expected_show}", 'pass'))
                 
-                if len(diff_lines) > max_diff_lines:
-                    self._log(f"  ... 还有 {len(diff_lines) - max_diff_lines} 处差异", 'dim')
+                if diff_count > max_diff_lines:
+                    log((f"  ... 还有 {diff_count - max_diff_lines} 处差异", 'dim'))
         
-        self._log("", None)
-        self.output_text.config(state=tk.DISABLED)
+        log(("", None))
+        self._log_lines(lines)
     
     def _clear_output(self):
         """清空输出"""
+        if self._log_buffer:
+            self._log_buffer = []
         self.output_text.config(state=tk.NORMAL)
         self.output_text.delete(1.0, tk.END)
         self.output_text.config(state=tk.DISABLED)
@@ -2,22 +2,65 @@
 用例编写标签页 - 现代化设计
 """
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk
+import queue
+import re
+import threading
+from collections import deque
 from datetime import datetime
 from typing import TYPE_CHECKING
 
 from .base import BaseTab
-from .theme import COLORS, create_styled_text
+from .theme import COLORS, FONT_HEADER, create_styled_text
 from .widgets import IconButton
 from ..discovery import TestDiscovery
+from ..utils import write_file_atomic
 
 if TYPE_CHECKING:
     from .app import TestApp
 
 
+# 保存相关的状态栏提示
+_MSG_UNCHANGED = "✓ 未修改: testfile%d.txt"
+_MSG_SAVING = "保存中: testfile%d.txt"
+_MSG_SAVED = "✓ 已保存: %s"
+_MSG_SAVED_NEXT = "✓ 已保存，继续编写下一个"
+
+
+def _line_numbers_offset(n: int) -> int:
+    """"1\n2\n...\nn\n" 的长度，即行号 n+1 在行号文本中的起始位置"""
+    total = 0
+    low, digits = 1, 1
+    while low <= n:
+        high = min(n, low * 10 - 1)
+        total += (high - low + 1) * (digits + 1)
+        low *= 10
+        digits += 1
+    return total
+
+
 class EditorTab(BaseTab):
     """用例编写标签页"""
     
+    def __init__(self, parent: ttk.Frame, app: 'TestApp'):
+        super().__init__(parent, app)
+        self._update_pending = False
+        self._char_count_after_id = None
+        self._gutter_view = None  # 行号栏当前显示的 (首行, 末行, 首行卷出顶部的像素数)
+        # 已格式化过的行号文本 "1\n2\n...\nN\n"，行数回落后再增长时直接切片复用
+        self._ln_text = ""
+        self._ln_text_count = 0
+        # 最近一次保存的内容摘要: (库名, 编号) -> (hash(code), hash(input))
+        self._last_saved = {}
+        # 测试库列表缓存: (testfiles 目录 mtime_ns, 库列表)
+        self._libs_cache = None
+        
+        # 后台写盘：GUI 线程投递任务，写盘线程把结果放回 deque，由 GUI 线程轮询取回
+        self._write_queue = queue.Queue()
+        self._save_results = deque()
+        self._pending_saves = 0
+        threading.Thread(target=self._writer_loop, daemon=True).start()
+    
     def build(self):
         """构建用例编写标签页"""
         main_frame = ttk.Frame(self.parent, padding=12)
@@ -29,6 +72,7 @@ class EditorTab(BaseTab):
     
     def _build_toolbar(self, parent):
         """工具栏 - 分两行显示"""
+        font_ui = (self.config.gui.get_font(), 10)
         toolbar = ttk.Frame(parent)
         toolbar.pack(fill=tk.X, pady=(0, 12))
         
@@ -41,14 +85,29 @@ class EditorTab(BaseTab):
         self.editor_dir_var = tk.StringVar()
         self.editor_dir_combo = ttk.Combobox(
             row1, textvariable=self.editor_dir_var, 
-            width=35, font=(self.config.gui.get_font(), 10)
+            width=35, font=font_ui
         )
         self.editor_dir_combo.pack(side=tk.LEFT, padx=(12, 8))
         
         IconButton(row1, icon='plus', text='新建库',
-                   command=self._create_new_lib).pack(side=tk.LEFT, padx=(0, 4))
+                   command=self._show_new_lib_row).pack(side=tk.LEFT, padx=(0, 4))
         IconButton(row1, icon='refresh', text='刷新',
-                   command=self.refresh_libs).pack(side=tk.LEFT)
+                   command=lambda: self.refresh_libs(force=True)).pack(side=tk.LEFT)
+        
+        # 新建库输入行（默认隐藏，点击"新建库"后显示在第一行下方）
+        self._row1 = row1
+        self.new_lib_row = ttk.Frame(toolbar)
+        ttk.Label(self.new_lib_row, text="新库名称").pack(side=tk.LEFT)
+        self.new_lib_var = tk.StringVar()
+        self.new_lib_entry = ttk.Entry(self.new_lib_row, textvariable=self.new_lib_var,
+                                       width=35, font=font_ui)
+        self.new_lib_entry.pack(side=tk.LEFT, padx=(12, 8))
+        self.new_lib_entry.bind('<Return>', lambda e: self._create_new_lib())
+        self.new_lib_entry.bind('<Escape>', lambda e: self._hide_new_lib_row())
+        IconButton(self.new_lib_row, text='创建', command=self._create_new_lib,
+                   style='Accent.TButton').pack(side=tk.LEFT, padx=(0, 4))
+        IconButton(self.new_lib_row, text='取消',
+                   command=self._hide_new_lib_row).pack(side=tk.LEFT)
         
         # 第二行：编号和操作按钮
         row2 = ttk.Frame(toolbar)
@@ -62,7 +121,7 @@ class EditorTab(BaseTab):
         
         self.editor_num_var = tk.StringVar(value="1")
         num_entry = ttk.Entry(left_frame, textvariable=self.editor_num_var, 
-                              width=5, font=(self.config.gui.get_font(), 10))
+                              width=5, font=font_ui)
         num_entry.pack(side=tk.LEFT, padx=(8, 4))
         
         IconButton(left_frame, text='自动编号',
@@ -81,6 +140,7 @@ class EditorTab(BaseTab):
     
     def _build_editor_section(self, parent):
         """编辑区"""
+        font_main = (self.config.gui.get_font(), self.config.gui.font_size)
         # 使用PanedWindow实现可调整大小
         paned = ttk.PanedWindow(parent, orient=tk.HORIZONTAL)
         paned.pack(fill=tk.BOTH, expand=True)
@@ -93,7 +153,7 @@ class EditorTab(BaseTab):
         code_header = ttk.Frame(code_frame)
         code_header.pack(fill=tk.X, pady=(0, 6))
         ttk.Label(code_header, text="📝 SysY 源代码",
-                  font=('微软雅黑', 10, 'bold')).pack(side=tk.LEFT)
+                  font=FONT_HEADER).pack(side=tk.LEFT)
         ttk.Label(code_header, text="testfile.txt", style='Status.TLabel').pack(side=tk.RIGHT)
         
         # 代码编辑器容器
@@ -104,7 +164,7 @@ class EditorTab(BaseTab):
         self.line_numbers = tk.Text(
             code_container, width=4, padx=4, pady=8,
             bg=COLORS['bg_tertiary'], fg=COLORS['fg_muted'],
-            font=(self.config.gui.get_font(), self.config.gui.font_size),
+            font=font_main,
             state=tk.DISABLED, borderwidth=0, highlightthickness=0
         )
         self.line_numbers.pack(side=tk.LEFT, fill=tk.Y)
@@ -112,23 +172,28 @@ class EditorTab(BaseTab):
         # 代码文本框
         self.code_text = create_styled_text(
             code_container,
-            font=(self.config.gui.get_font(), self.config.gui.font_size),
+            font=font_main,
             wrap=tk.NONE, undo=True
         )
-        code_scroll_y = ttk.Scrollbar(code_container, orient=tk.VERTICAL,
-                                       command=self._sync_scroll)
+        # 首行完整显示时在 dlineinfo 中的 y 坐标（边框 + 高亮框 + 内边距）
+        self._code_inset = sum(
+            self.code_text.winfo_pixels(self.code_text.cget(opt))
+            for opt in ('borderwidth', 'highlightthickness', 'pady')
+        )
+        code_scroll_y = ttk.Scrollbar(code_container, orient=tk.VERTICAL)
         code_scroll_x = ttk.Scrollbar(code_frame, orient=tk.HORIZONTAL,
                                        command=self.code_text.xview)
-        self.code_text.configure(yscrollcommand=self._on_code_scroll,
-                                  xscrollcommand=code_scroll_x.set)
+        self.code_text.configure(xscrollcommand=code_scroll_x.set)
+        self._link_vertical_scroll(code_scroll_y)
         
         self.code_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         code_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
         code_scroll_x.pack(fill=tk.X)
         
-        # 绑定事件更新行号
-        self.code_text.bind('<KeyRelease>', self._update_line_numbers)
-        self.code_text.bind('<MouseWheel>', self._update_line_numbers)
+        # 内容变化时延迟更新行号和字符统计（方向键等导航按键不会触发 <<Modified>>）
+        self.code_text.bind('<<Modified>>', self._on_modified)
+        # 窗口大小变化会改变可见行范围
+        self.code_text.bind('<Configure>', self._update_line_numbers, add='+')
         
         # 右侧：输入数据编辑
         input_frame = ttk.Frame(paned)
@@ -138,16 +203,34 @@ class EditorTab(BaseTab):
         input_header = ttk.Frame(input_frame)
         input_header.pack(fill=tk.X, pady=(0, 6))
         ttk.Label(input_header, text="📥 输入数据",
-                  font=('微软雅黑', 10, 'bold')).pack(side=tk.LEFT)
+                  font=FONT_HEADER).pack(side=tk.LEFT)
         ttk.Label(input_header, text="input.txt", style='Status.TLabel').pack(side=tk.RIGHT)
         
-        # 输入文本框
-        input_container = ttk.Frame(input_frame)
+        # 输入文本框在首次点击时再创建，先放一个占位提示
+        self._input_frame = input_frame
+        self._font_main = font_main
+        self.input_text = None
+        self._input_placeholder = ttk.Label(
+            input_frame, text="点击以编辑输入数据", style='Status.TLabel', anchor=tk.CENTER
+        )
+        self._input_placeholder.pack(fill=tk.BOTH, expand=True)
+        self._input_placeholder.bind('<Button-1>', lambda e: self._build_input_pane())
+        
+        # 初始化行号
+        self._update_line_numbers()
+    
+    def _build_input_pane(self):
+        """创建输入数据编辑框（替换占位提示）"""
+        if self.input_text is not None:
+            return
+        self._input_placeholder.destroy()
+        
+        input_container = ttk.Frame(self._input_frame)
         input_container.pack(fill=tk.BOTH, expand=True)
         
         self.input_text = create_styled_text(
             input_container,
-            font=(self.config.gui.get_font(), self.config.gui.font_size),
+            font=self._font_main,
             wrap=tk.NONE, undo=True
         )
         input_scroll = ttk.Scrollbar(input_container, orient=tk.VERTICAL,
@@ -158,11 +241,10 @@ class EditorTab(BaseTab):
         input_scroll.pack(side=tk.RIGHT, fill=tk.Y)
         
         # 提示
-        ttk.Label(input_frame, text="💡 每行一个整数", 
+        ttk.Label(self._input_frame, text="💡 每行一个整数", 
                   style='Status.TLabel').pack(anchor=tk.W, pady=(6, 0))
         
-        # 初始化行号
-        self._update_line_numbers()
+        self.input_text.focus_set()
     
     def _build_status_section(self, parent):
         """状态栏"""
@@ -180,44 +262,126 @@ class EditorTab(BaseTab):
         self.char_count_var = tk.StringVar(value="0 字符")
         ttk.Label(status_frame, textvariable=self.char_count_var,
                   style='Status.TLabel').pack(side=tk.RIGHT)
+    
+    def _set_status(self, text: str, error: bool = False):
+        """在状态栏显示提示（错误用红色）"""
+        self.editor_status_var.set(text)
+        self.status_label.configure(style='Error.TLabel' if error else 'Success.TLabel')
+    
+    def _link_vertical_scroll(self, scrollbar: ttk.Scrollbar):
+        """在 Tcl 层联动代码区和纵向滚动条
+        
+        滚动条直接调用代码区的 yview；代码区视图变化时由 Tcl 过程更新滚动条，
+        只有可见首/末行或首行的像素偏移变化时才回到 Python 刷新行号
+        """
+        text = str(self.code_text)
+        proc = '::gutter_sync' + re.sub(r'\W', '_', text)
+        update_cmd = self.code_text.register(self._update_line_numbers)
+        self.code_text.tk.eval(f'''
+            set {proc}_view {{}}
+            proc {proc} {{first last}} {{
+                {scrollbar} set $first $last
+                set top [lindex [{text} dlineinfo @0,0] 1]
+                set view [list [{text} index @0,0] [{text} index @0,[winfo height {text}]] $top]
+                if {{$view ne ${proc}_view}} {{
+                    set {proc}_view $view
+                    {update_cmd}
+                }}
+            }}
+        ''')
+        scrollbar.configure(command=f'{text} yview')
+        self.code_text.configure(yscrollcommand=proc)
+    
+    def _on_modified(self, event=None):
+        """代码内容变化"""
+        if not self.code_text.edit_modified():
+            return
+        # 复位修改标志，否则之后的修改不会再触发 <<Modified>>
+        self.code_text.edit_modified(False)
+        self._schedule_update()
+    
+    def _schedule_update(self, event=None):
+        """合并连续按键：行号每帧（约 16ms）最多更新一次，字符统计在停止输入 150ms 后更新"""
+        if self._char_count_after_id is not None:
+            self.code_text.after_cancel(self._char_count_after_id)
+        self._char_count_after_id = self.code_text.after(150, self._do_char_count)
         
-        # 绑定更新字符统计
-        self.code_text.bind('<KeyRelease>', self._update_char_count, add='+')
+        if self._update_pending:
+            return
+        self._update_pending = True
+        self.code_text.after(16, self._do_update)
     
-    def _sync_scroll(self, *args):
-        """同步滚动"""
-        self.code_text.yview(*args)
-        self.line_numbers.yview(*args)
+    def _do_update(self):
+        """执行延迟的行号更新"""
+        self._update_pending = False
+        self._update_line_numbers()
     
-    def _on_code_scroll(self, *args):
-        """代码滚动时同步行号"""
-        self.line_numbers.yview_moveto(args[0])
-        return True
+    def _do_char_count(self):
+        """执行延迟的字符统计更新"""
+        self._char_count_after_id = None
+        self._update_char_count()
     
     def _update_line_numbers(self, event=None):
-        """更新行号"""
-        self.line_numbers.config(state=tk.NORMAL)
-        self.line_numbers.delete(1.0, tk.END)
-        
-        line_count = int(self.code_text.index('end-1c').split('.')[0])
-        line_numbers_text = '\n'.join(str(i) for i in range(1, line_count + 1))
-        self.line_numbers.insert(1.0, line_numbers_text)
-        
-        self.line_numbers.config(state=tk.DISABLED)
+        """更新行号：只渲染代码区当前可见的行，开销与文件总行数无关"""
+        text = self.code_text
+        # @x,y 索引会被夹到已有内容内，末行不会超过总行数
+        first = int(text.index('@0,0').split('.')[0])
+        last = int(text.index(f'@0,{text.winfo_height()}').split('.')[0])
+        # 拖动滚动条或按像素滚动后首行可能只露出一部分，行号栏要跟着偏移同样的像素
+        info = text.dlineinfo('@0,0')
+        hidden = max(self._code_inset - info[1], 0) if info else 0
+        view = (first, last, hidden)
+        if view == self._gutter_view:
+            return
+        lines_changed = self._gutter_view is None or self._gutter_view[:2] != (first, last)
+        self._gutter_view = view
+        
+        # 直接调用 Tcl 命令，跳过 tkinter 的 config()/insert() 参数包装
+        widget = self.line_numbers
+        call = widget.tk.call
+        if lines_changed:
+            # 多渲染一行，保证行号栏向下偏移时底部不缺行
+            end = min(last + 1, int(text.index('end-1c').split('.')[0]))
+            call(widget, 'configure', '-state', 'normal')
+            call(widget, 'delete', '1.0', 'end')
+            call(widget, 'insert', '1.0', self._line_numbers_text(first - 1, end))
+            call(widget, 'configure', '-state', 'disabled')
+        call(widget, 'yview', 'moveto', 0)
+        if hidden:
+            call(widget, 'yview', 'scroll', hidden, 'pixels')
+    
+    def _line_numbers_text(self, start: int, end: int) -> str:
+        """返回行号 start+1 .. end 以换行连接的文本"""
+        if end > self._ln_text_count:
+            self._ln_text += ''.join(f'{i}\n' for i in range(self._ln_text_count + 1, end + 1))
+            self._ln_text_count = end
+        return self._ln_text[_line_numbers_offset(start):_line_numbers_offset(end) - 1]
     
     def _update_char_count(self, event=None):
-        """更新字符统计"""
-        content = self.code_text.get(1.0, tk.END)
-        char_count = len(content.strip())
-        line_count = content.count('\n')
-        self.char_count_var.set(f"{char_count} 字符 | {line_count} 行")
+        """更新字符统计（由 Tk 直接计数，不复制整个缓冲区）"""
+        # 计到 end 会包含 Tk 末尾自带的换行，字符数减去它，行数正好是总行数
+        chars, lines = self.code_text.count('1.0', tk.END, 'chars', 'lines')
+        self.char_count_var.set(f"{chars - 1} 字符 | {lines} 行")
 
     # ========== 事件处理 ==========
     
-    def refresh_libs(self, set_default: bool = False):
-        """刷新测试库列表"""
+    def refresh_libs(self, set_default: bool = False, force: bool = False):
+        """刷新测试库列表
+        
+        testfiles 目录的 mtime 未变化时复用上次扫描结果；嵌套子目录里的变化
+        不会反映到顶层 mtime，本页保存用例后会主动失效缓存，"刷新"按钮强制重新扫描
+        """
         testfiles_dir = self.test_dir / "testfiles"
-        libs = TestDiscovery.discover_test_libs(testfiles_dir)
+        try:
+            mtime = testfiles_dir.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+        
+        if not force and self._libs_cache is not None and self._libs_cache[0] == mtime:
+            libs = self._libs_cache[1]
+        else:
+            libs = TestDiscovery.discover_test_libs(testfiles_dir)
+            self._libs_cache = (mtime, libs)
         
         lib_names = [str(lib.relative_to(testfiles_dir)) for lib in libs]
         
@@ -231,86 +395,150 @@ class EditorTab(BaseTab):
         if set_default or not self.editor_dir_var.get():
             self.editor_dir_combo.set(default_name)
     
+    def _show_new_lib_row(self):
+        """显示新建库输入行"""
+        self.new_lib_var.set("")
+        self.new_lib_row.pack(fill=tk.X, pady=(0, 8), after=self._row1)
+        self.new_lib_entry.focus_set()
+    
+    def _hide_new_lib_row(self):
+        """隐藏新建库输入行"""
+        self.new_lib_row.pack_forget()
+    
     def _create_new_lib(self):
         """创建新测试库"""
-        name = simpledialog.askstring("新建测试库", "请输入测试库名称:",
-                                       parent=self.parent)
+        name = self.new_lib_var.get().strip()
         if not name:
+            self._set_status("⚠ 请输入测试库名称", error=True)
             return
         
         new_dir = self.test_dir / "testfiles" / name
         if new_dir.exists():
-            messagebox.showerror("错误", f"测试库 '{name}' 已存在")
+            self._set_status(f"⚠ 测试库 '{name}' 已存在", error=True)
             return
         
         new_dir.mkdir(parents=True)
+        self._hide_new_lib_row()
         self.refresh_libs()
-        self.app.test_tab.refresh_lists()
+        self.app.test_tab.mark_lists_dirty()
         self.editor_dir_combo.set(name)
-        self.editor_status_var.set(f"✓ 已创建: {name}")
+        self._set_status(f"✓ 已创建: {name}")
     
     def _auto_number(self):
         """自动获取下一个编号"""
         lib_name = self.editor_dir_var.get()
         if not lib_name:
-            messagebox.showwarning("提示", "请先选择测试库")
+            self._set_status("⚠ 请先选择测试库", error=True)
             return
         
         lib_path = self.test_dir / "testfiles" / lib_name
         next_num = TestDiscovery.get_next_testfile_number(lib_path)
         self.editor_num_var.set(str(next_num))
-        self.editor_status_var.set(f"下一个编号: {next_num}")
+        self._set_status(f"下一个编号: {next_num}")
     
-    def _save_testcase(self) -> bool:
-        """保存测试用例"""
+    def _save_testcase(self, advance: bool = False) -> bool:
+        """保存测试用例；advance 为 True 时在写盘成功后切到下一个编号"""
         lib_name = self.editor_dir_var.get()
         if not lib_name:
-            messagebox.showwarning("提示", "请先选择测试库")
+            self._set_status("⚠ 请先选择测试库", error=True)
             return False
         
         try:
             num = int(self.editor_num_var.get())
         except ValueError:
-            messagebox.showerror("错误", "编号必须是数字")
+            self._set_status("⚠ 编号必须是数字", error=True)
             return False
         
         code = self.code_text.get(1.0, tk.END).rstrip()
         if not code:
-            messagebox.showwarning("提示", "请输入源代码")
+            self._set_status("⚠ 请输入源代码", error=True)
             return False
         
-        lib_path = self.test_dir / "testfiles" / lib_name
-        lib_path.mkdir(parents=True, exist_ok=True)
+        input_data = self.input_text.get(1.0, tk.END).rstrip() if self.input_text else ""
         
-        # 保存testfile
+        lib_path = self.test_dir / "testfiles" / lib_name
         testfile_path = lib_path / f"testfile{num}.txt"
-        with open(testfile_path, "w", encoding="utf-8", newline="\n") as f:
-            f.write(code)
-        
-        # 保存input
-        input_data = self.input_text.get(1.0, tk.END).rstrip()
         input_path = lib_path / f"input{num}.txt"
-        with open(input_path, "w", encoding="utf-8", newline="\n") as f:
-            f.write(input_data)
         
-        self.editor_status_var.set(f"✓ 已保存: testfile{num}.txt")
-        self.app.test_tab.refresh_lists()
+        # 内容与上次保存一致且文件仍在时跳过写盘
+        key = (lib_name, num)
+        digest = (hash(code), hash(input_data))
+        if (self._last_saved.get(key) == digest
+                and testfile_path.exists() and input_path.exists()):
+            self._set_status(_MSG_UNCHANGED % num)
+            if advance:
+                self._advance_editor(key, code)
+            return True
+        
+        # 乐观记录，写盘失败时再撤销
+        self._last_saved[key] = digest
+        self._write_queue.put((key, testfile_path, code, input_path, input_data, advance))
+        if self._pending_saves == 0:
+            self.parent.after(20, self._poll_save_results)
+        self._pending_saves += 1
+        
+        self._set_status(_MSG_SAVING % num)
         return True
     
-    def _save_and_next(self):
-        """保存并新建下一个"""
-        if self._save_testcase():
+    def _writer_loop(self):
+        """写盘线程"""
+        while True:
+            job = self._write_queue.get()
+            _, testfile_path, code, input_path, input_data, _ = job
             try:
-                num = int(self.editor_num_var.get())
-                self.editor_num_var.set(str(num + 1))
-            except ValueError:
-                pass
-            self._clear_editor()
-            self.editor_status_var.set(f"✓ 已保存，继续编写下一个")
+                testfile_path.parent.mkdir(parents=True, exist_ok=True)
+                write_file_atomic(testfile_path, code)
+                write_file_atomic(input_path, input_data)
+                error = None
+            except Exception as e:
+                # 任何异常都要回报，否则写盘线程退出后保存会被静默丢弃
+                error = e
+            self._save_results.append((job, error))
+    
+    def _poll_save_results(self):
+        """在 GUI 线程处理写盘结果"""
+        saved = False
+        while self._save_results:
+            (key, testfile_path, code, _, _, advance), error = self._save_results.popleft()
+            self._pending_saves -= 1
+            if error is not None:
+                self._last_saved.pop(key, None)
+                self._set_status(f"✗ 保存失败: {error}", error=True)
+            else:
+                saved = True
+                self._set_status(_MSG_SAVED % testfile_path.name)
+                if advance:
+                    self._advance_editor(key, code)
+        
+        if saved:
+            # 可能新增了测试库
+            self._libs_cache = None
+            self.app.test_tab.mark_lists_dirty()
+        if self._pending_saves:
+            self.parent.after(20, self._poll_save_results)
+    
+    def _save_and_next(self):
+        """保存并新建下一个（写盘成功后才清空编辑器）"""
+        self._save_testcase(advance=True)
+    
+    def _advance_editor(self, key: tuple, code: str):
+        """切到下一个编号并清空编辑器；保存期间用户已改动库、编号或代码时保留现场"""
+        lib_name, num = key
+        try:
+            current = int(self.editor_num_var.get())
+        except ValueError:
+            return
+        if (current != num or self.editor_dir_var.get() != lib_name
+                or self.code_text.get(1.0, tk.END).rstrip() != code):
+            return
+        self.editor_num_var.set(str(num + 1))
+        self._clear_editor()
+        self._set_status(_MSG_SAVED_NEXT)
     
     def _clear_editor(self):
         """清空编辑器"""
         self.code_text.delete(1.0, tk.END)
-        self.input_text.delete(1.0, tk.END)
+        if self.input_text:
+            self.input_text.delete(1.0, tk.END)
         self._update_line_numbers()
         self._update_char_count()
@@ -5,34 +5,61 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, TYPE_CHECKING
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+import os
 import threading
 import queue
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
 from .base import BaseTab, OutputMixin
-from .theme import COLORS, create_styled_listbox, create_styled_text
+from .theme import COLORS, FONT_HEADER, create_styled_listbox, create_styled_text
 from .widgets import AnimatedProgressBar, IconButton
 from ..discovery import TestDiscovery
+from ..models import TestCase
 from ..tester import CompilerTester
 
 if TYPE_CHECKING:
     from .app import TestApp
 
 
+def _insert_items(listbox: tk.Listbox, items: List[str], chunk: int = 1000):
+    """一次 insert 写入多项（分块，避免单条 Tcl 命令参数过多）"""
+    for i in range(0, len(items), chunk):
+        listbox.insert(tk.END, *items[i:i + chunk])
+
+
 class TestTab(BaseTab, OutputMixin):
     """测试运行标签页"""
     
     def __init__(self, parent: ttk.Frame, app: 'TestApp'):
         super().__init__(parent, app)
         self.tester: Optional[CompilerTester] = None
+        # 项目目录 -> (config.json mtime, 实例)，配置未变时复用同一个测试器
+        self._tester_cache: Dict[Path, Tuple[int, CompilerTester]] = {}
         self.is_running = False
-        self.message_queue = queue.Queue()
+        self._stop_event = threading.Event()
+        self.message_queue = queue.SimpleQueue()
         self.current_lib_path: Optional[Path] = None
+        # 上次写入进度条的整数百分比，变化不足 1% 时不重绘
+        self._last_progress_pct = -1
+        # 与 lib_listbox 行号一一对应的库路径
+        self._lib_paths: List[Path] = []
         self.case_menu: Optional[tk.Menu] = None
+        self._menu_input_idx = 0
+        # 其他标签页写入用例后置位，切回本页时再统一刷新
+        self._lists_dirty = False
+        # 用例发现缓存: 库目录 -> (目录 mtime_ns, 用例列表)；列表只读，勿原地修改
+        self._case_cache: Dict[Path, Tuple[int, List[TestCase]]] = {}
+        # 用例列表框当前显示的用例，与列表框下标一一对应
+        self._current_cases: List[TestCase] = []
     
     def build(self):
         """构建测试运行标签页"""
+        # 字体在各 _build_* 间共用，只解析一次
+        self._font_family = self.config.gui.get_font()
+        self._font_size = self.config.gui.font_size
+        
         main_frame = ttk.Frame(self.parent, padding=12)
         main_frame.pack(fill=tk.BOTH, expand=True)
         
@@ -67,7 +94,7 @@ class TestTab(BaseTab, OutputMixin):
         self.project_var = tk.StringVar()
         self.project_entry = ttk.Entry(
             path_frame, textvariable=self.project_var,
-            font=(self.config.gui.get_font(), 10)
+            font=(self._font_family, 10)
         )
         self.project_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(12, 8))
         
@@ -95,7 +122,7 @@ class TestTab(BaseTab, OutputMixin):
         left_header = ttk.Frame(left_frame)
         left_header.pack(fill=tk.X, pady=(0, 6))
         ttk.Label(left_header, text="📚 测试库", style='Card.TLabel',
-                  font=('微软雅黑', 10, 'bold')).pack(side=tk.LEFT)
+                  font=FONT_HEADER).pack(side=tk.LEFT)
         self.lib_count_label = ttk.Label(left_header, text="", style='Status.TLabel')
         self.lib_count_label.pack(side=tk.RIGHT)
         
@@ -105,7 +132,7 @@ class TestTab(BaseTab, OutputMixin):
         
         self.lib_listbox = create_styled_listbox(
             lib_container, selectmode=tk.SINGLE, exportselection=False,
-            font=(self.config.gui.get_font(), self.config.gui.font_size)
+            font=(self._font_family, self._font_size)
         )
         lib_scroll = ttk.Scrollbar(lib_container, orient=tk.VERTICAL, 
                                     command=self.lib_listbox.yview)
@@ -123,7 +150,7 @@ class TestTab(BaseTab, OutputMixin):
         right_header = ttk.Frame(right_frame)
         right_header.pack(fill=tk.X, pady=(0, 6))
         ttk.Label(right_header, text="📝 测试用例", style='Card.TLabel',
-                  font=('微软雅黑', 10, 'bold')).pack(side=tk.LEFT)
+                  font=FONT_HEADER).pack(side=tk.LEFT)
         self.case_count_label = ttk.Label(right_header, text="", style='Status.TLabel')
         self.case_count_label.pack(side=tk.RIGHT)
         IconButton(right_header, text='记事本打开',
@@ -135,7 +162,7 @@ class TestTab(BaseTab, OutputMixin):
         
         self.case_listbox = create_styled_listbox(
             case_container, selectmode=tk.EXTENDED, exportselection=False,
-            font=(self.config.gui.get_font(), self.config.gui.font_size)
+            font=(self._font_family, self._font_size)
         )
         case_scroll = ttk.Scrollbar(case_container, orient=tk.VERTICAL,
                                      command=self.case_listbox.yview)
@@ -207,7 +234,7 @@ class TestTab(BaseTab, OutputMixin):
         header = ttk.Frame(output_frame)
         header.pack(fill=tk.X, pady=(0, 6))
         ttk.Label(header, text="📋 输出日志", style='Card.TLabel',
-                  font=('微软雅黑', 10, 'bold')).pack(side=tk.LEFT)
+                  font=FONT_HEADER).pack(side=tk.LEFT)
         IconButton(header, icon='save', text='导出',
                    command=self._export_log).pack(side=tk.RIGHT, padx=(0, 4))
         IconButton(header, icon='clear', text='清空',
@@ -219,7 +246,7 @@ class TestTab(BaseTab, OutputMixin):
         
         self.output_text = create_styled_text(
             text_container,
-            font=(self.config.gui.get_font(), self.config.gui.font_size - 1),
+            font=(self._font_family, self._font_size - 1),
             wrap=tk.WORD, state=tk.DISABLED
         )
         output_scroll = ttk.Scrollbar(text_container, orient=tk.VERTICAL,
@@ -233,6 +260,7 @@ class TestTab(BaseTab, OutputMixin):
         self._setup_output_tags()
     
     def _export_log(self):
+        self._flush_log()
         content = self.output_text.get("1.0", tk.END)
         if not content.strip():
             messagebox.showinfo("提示", "当前没有可导出的日志")
@@ -274,10 +302,26 @@ class TestTab(BaseTab, OutputMixin):
     def _update_compiler_info(self):
         """更新编译器信息"""
         if self.app.project_dir:
-            tester = CompilerTester(self.app.project_dir, self.test_dir)
-            lang = tester.get_compiler_language().upper()
+            lang = self._get_tester().get_compiler_language().upper()
             self.compiler_info.configure(text=f"🔧 检测到 {lang} 编译器")
     
+    def _get_tester(self) -> CompilerTester:
+        """获取当前项目的测试器，config.json 未修改时复用缓存实例"""
+        project_dir = Path(self.app.project_dir)
+        mtime = 0
+        for config_path in (project_dir / "src" / "config.json", project_dir / "config.json"):
+            try:
+                mtime = config_path.stat().st_mtime_ns
+                break
+            except OSError:
+                continue
+        cached = self._tester_cache.get(project_dir)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        tester = CompilerTester(project_dir, self.test_dir)
+        self._tester_cache[project_dir] = (mtime, tester)
+        return tester
+    
     def _browse_project(self):
         """浏览选择项目目录"""
         path = filedialog.askdirectory(title="选择编译器项目目录")
@@ -293,7 +337,7 @@ class TestTab(BaseTab, OutputMixin):
             messagebox.showerror("错误", "请先选择项目目录")
             return
         
-        self.tester = CompilerTester(self.app.project_dir, self.test_dir)
+        self.tester = self._get_tester()
         lang = self.tester.get_compiler_language().upper()
         self._log(f"⚙️ 正在编译 {lang} 项目...", 'info')
         self.status_var.set(f"正在编译 {lang} 项目...")
@@ -309,32 +353,85 @@ class TestTab(BaseTab, OutputMixin):
         self.lib_listbox.delete(0, tk.END)
         self.case_listbox.delete(0, tk.END)
         
+        self._case_cache.clear()
+        self._current_cases = []
+        
         testfiles_dir = self.test_dir / "testfiles"
         libs = TestDiscovery.discover_test_libs(testfiles_dir)
         
+        # 各库扫描以目录 I/O 为主，并行执行；缓存只在主线程写入
+        scanned = []
+        if libs:
+            with ThreadPoolExecutor(max_workers=min(8, len(libs))) as executor:
+                scanned = list(executor.map(self._scan_lib, libs))
+        
         total_cases = 0
-        for lib in libs:
+        lib_labels = []
+        for lib, entry in zip(libs, scanned):
             rel_path = lib.relative_to(testfiles_dir)
-            cases = TestDiscovery.discover_in_dir(lib)
+            cases = entry[1] if entry else []
+            if entry:
+                self._case_cache[lib] = entry
             total_cases += len(cases)
-            self.lib_listbox.insert(tk.END, f"{rel_path} ({len(cases)})")
+            lib_labels.append(f"{rel_path} ({len(cases)})")
+        self._lib_paths = libs
+        _insert_items(self.lib_listbox, lib_labels)
         
         self.lib_count_label.configure(text=f"{len(libs)} 个库")
         self._log(f"📚 发现 {len(libs)} 个测试库，共 {total_cases} 个用例", 'info')
     
+    @staticmethod
+    def _scan_lib(lib_path: Path) -> Optional[Tuple[int, List[TestCase]]]:
+        """扫描测试库，返回 (目录 mtime, 用例列表)；目录不可访问时返回 None"""
+        try:
+            mtime = lib_path.stat().st_mtime_ns
+        except OSError:
+            return None
+        return mtime, TestDiscovery.discover_in_dir(lib_path)
+    
+    def _cases_for(self, lib_path: Path) -> List[TestCase]:
+        """获取测试库的用例列表（目录 mtime 未变时复用缓存）"""
+        try:
+            mtime = lib_path.stat().st_mtime_ns
+        except OSError:
+            return []
+        cached = self._case_cache.get(lib_path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        cases = TestDiscovery.discover_in_dir(lib_path)
+        self._case_cache[lib_path] = (mtime, cases)
+        return cases
+    
+    def mark_lists_dirty(self):
+        """用例有变化：本页可见时立即刷新，否则等切换到本页时再刷新"""
+        if self.app.notebook.select() == str(self.parent):
+            self.refresh_lists()
+        else:
+            self._lists_dirty = True
+    
+    def refresh_if_dirty(self):
+        """切换到本页时调用"""
+        if self._lists_dirty:
+            self._lists_dirty = False
+            self.refresh_lists()
+    
     def _on_lib_select(self, event):
         """选择测试库时更新用例列表"""
         selection = self.lib_listbox.curselection()
         if not selection:
             return
         
-        self.case_listbox.delete(0, tk.END)
-        lib_name = self.lib_listbox.get(selection[0]).split(' (')[0]
-        self.current_lib_path = self.test_dir / "testfiles" / lib_name
+        lib_path = self._lib_paths[selection[0]]
+        
+        cases = self._cases_for(lib_path)
+        # 重复点击同一个库且用例未变化时保留现有列表（连同用户的选择）
+        if lib_path == self.current_lib_path and cases is self._current_cases:
+            return
         
-        cases = TestDiscovery.discover_in_dir(self.current_lib_path)
-        for case in cases:
-            self.case_listbox.insert(tk.END, case.name)
+        self.current_lib_path = lib_path
+        self._current_cases = cases
+        self.case_listbox.delete(0, tk.END)
+        _insert_items(self.case_listbox, [case.name for case in cases])
         
         self.case_count_label.configure(text=f"{len(cases)} 个用例")
     
@@ -355,7 +452,7 @@ class TestTab(BaseTab, OutputMixin):
         if not selection:
             return None
         
-        all_cases = TestDiscovery.discover_in_dir(lib_path)
+        all_cases = self._current_cases
         idx = selection[0]
         if idx < 0 or idx >= len(all_cases):
             return None
@@ -367,8 +464,17 @@ class TestTab(BaseTab, OutputMixin):
             messagebox.showerror("错误", f"文件不存在: {file_path}")
             return
         
+        # 等事件循环空闲时再启动外部程序，避免点击瞬间界面卡顿
+        self.parent.after_idle(self._launch_editor, file_path)
+    
+    def _launch_editor(self, file_path: Path):
+        """用系统关联的编辑器打开文件，不可用时回落到记事本"""
         try:
-            subprocess.Popen(["notepad.exe", str(file_path)])
+            try:
+                os.startfile(str(file_path), "edit")
+            except (AttributeError, OSError):
+                # 非 Windows 没有 os.startfile；文件类型未关联 edit 操作时也会失败
+                subprocess.Popen(["notepad.exe", str(file_path)])
         except Exception as e:
             messagebox.showerror("错误", f"打开失败: {e}")
     
@@ -401,13 +507,17 @@ class TestTab(BaseTab, OutputMixin):
             self.case_listbox.activate(idx)
         
         if self.case_menu is None:
+            # 菜单只在首次右键时创建一次，之后仅切换 input 项的可用状态
             self.case_menu = tk.Menu(self.parent, tearoff=0)
+            self.case_menu.add_command(label="用记事本打开 testfile", command=self._open_selected_testfile_in_notepad)
+            self.case_menu.add_command(label="用记事本打开 input", command=self._open_selected_input_in_notepad)
+            self._menu_input_idx = self.case_menu.index(tk.END)
         
-        self.case_menu.delete(0, tk.END)
-        self.case_menu.add_command(label="用记事本打开 testfile", command=self._open_selected_testfile_in_notepad)
         case = self._get_selected_case()
-        if case and case.input_file:
-            self.case_menu.add_command(label="用记事本打开 input", command=self._open_selected_input_in_notepad)
+        self.case_menu.entryconfigure(
+            self._menu_input_idx,
+            state=tk.NORMAL if case and case.input_file else tk.DISABLED
+        )
         
         try:
             self.case_menu.tk_popup(event.x_root, event.y_root)
@@ -428,8 +538,8 @@ class TestTab(BaseTab, OutputMixin):
             messagebox.showwarning("提示", "请选择要运行的测试用例")
             return
         
-        all_cases = TestDiscovery.discover_in_dir(lib_path)
-        selected_cases = [all_cases[i] for i in case_selection]
+        all_cases = self._current_cases
+        selected_cases = [all_cases[i] for i in case_selection if i < len(all_cases)]
         self._run_tests(selected_cases, f"运行 {len(selected_cases)} 个选中测试")
     
     def _run_current_lib(self):
@@ -439,17 +549,15 @@ class TestTab(BaseTab, OutputMixin):
             messagebox.showwarning("提示", "请先选择测试库")
             return
         
-        cases = TestDiscovery.discover_in_dir(lib_path)
+        cases = self._cases_for(lib_path)
         self._run_tests(cases, f"运行测试库: {lib_path.name}")
     
     def _run_all(self):
         """运行所有测试"""
         testfiles_dir = self.test_dir / "testfiles"
-        libs = TestDiscovery.discover_test_libs(testfiles_dir)
         
         all_cases = []
-        for lib in libs:
-            cases = TestDiscovery.discover_in_dir(lib)
+        for lib, cases in TestDiscovery.discover_all(testfiles_dir):
             for case in cases:
                 case.name = f"{lib.name}/{case.name}"
             all_cases.extend(cases)
@@ -467,18 +575,25 @@ class TestTab(BaseTab, OutputMixin):
             return
         
         self.is_running = True
+        # 每轮一个新事件，上一轮残留的工作线程不会看到本轮的状态
+        self._stop_event = stop_event = threading.Event()
         self.stop_btn.configure(state=tk.NORMAL)
         self._clear_output()
         self.progress.set(0)
+        self._last_progress_pct = 0
         self.result_label.configure(text="")
         
-        max_workers = self.config.parallel.max_workers
+        # 工作线程基本都在等待子进程，并行度超过 CPU 数两倍后只会互相争抢
+        max_workers = max(1, min(self.config.parallel.max_workers, 2 * (os.cpu_count() or 1)))
         self._log(f"🚀 {title}", 'header')
         self._log(f"   并行线程: {max_workers}", 'dim')
         
+        # 在 GUI 线程取测试器，缓存字典只在主线程读写
+        tester = self._get_tester()
+        
         def test_task():
-            self.tester = CompilerTester(self.app.project_dir, self.test_dir)
-            lang = self.tester.get_compiler_language().upper()
+            self.tester = tester
+            lang = tester.get_compiler_language().upper()
             self.message_queue.put(('status', f"正在编译 {lang} 项目..."))
             
             success, msg = self.tester.compile_project()
@@ -494,6 +609,8 @@ class TestTab(BaseTab, OutputMixin):
             
             passed, failed = 0, 0
             
+            total = len(cases)
+            
             def on_result(case, result, progress):
                 nonlocal passed, failed
                 if not self.is_running:
@@ -501,15 +618,14 @@ class TestTab(BaseTab, OutputMixin):
                 
                 if result.passed:
                     passed += 1
-                    self.message_queue.put(('result', case.name, result, True))
                 else:
                     failed += 1
-                    self.message_queue.put(('result', case.name, result, False))
-                
-                self.message_queue.put(('progress', progress, f"{passed + failed}/{len(cases)}"))
+                # 结果和进度合并为一条消息，状态文本由 GUI 线程按需格式化
+                self.message_queue.put(('result', case.name, result, progress, passed + failed, total))
             
             try:
-                self.tester.test_parallel(cases, max_workers, callback=on_result)
+                self.tester.test_parallel(cases, max_workers, callback=on_result,
+                                          stop_event=stop_event)
             except Exception as e:
                 self.message_queue.put(('error', str(e)))
                 return
@@ -522,16 +638,50 @@ class TestTab(BaseTab, OutputMixin):
         threading.Thread(target=test_task, daemon=True).start()
     
     def _stop_test(self):
-        """停止测试"""
+        """停止测试：不再启动新用例，并结束正在运行的子进程"""
         self.is_running = False
+        self._stop_event.set()
+        if self.tester:
+            self.tester.terminate_running()
     
     # ========== 消息处理 ==========
     
-    def process_queue(self):
-        """处理消息队列"""
+    # 每轮最多处理的消息数，剩余的留给下一轮，避免大批结果阻塞界面
+    MAX_MESSAGES_PER_TICK = 500
+    
+    def process_queue(self) -> bool:
+        """处理消息队列，返回本轮是否处理了消息
+        
+        日志统一缓冲，运行中每 LOG_FLUSH_MS 写入一次；进度只应用本轮最后一个结果携带的值
+        """
+        handled = 0
+        pending_progress = None
+        self._begin_log_batch()
         try:
-            while True:
+            # 单消费者：先判空再取，空闲轮询不走 queue.Empty 异常路径
+            while handled < self.MAX_MESSAGES_PER_TICK and not self.message_queue.empty():
                 msg = self.message_queue.get_nowait()
+                handled += 1
+                
+                if msg[0] == 'result':
+                    _, name, result, progress, done, total = msg
+                    pending_progress = (progress, done, total)
+                    if result.passed:
+                        self._log(f"✓ {name}", 'pass')
+                    else:
+                        self._log_failure(
+                            name=name,
+                            status=result.status,
+                            message=result.message or "",
+                            actual=result.actual_output,
+                            expected=result.expected_output
+                        )
+                    continue
+                
+                # 其余消息会改写进度/状态，先应用之前积压的进度以保持顺序
+                if pending_progress is not None:
+                    self._apply_progress(pending_progress)
+                    pending_progress = None
                 
                 if msg[0] == 'status':
                     _, status = msg
@@ -549,24 +699,6 @@ class TestTab(BaseTab, OutputMixin):
                     self._log(f"✗ 编译失败: {error_msg}", 'error')
                     self._finish_test(0, 0, stopped=True)
                 
-                elif msg[0] == 'progress':
-                    _, progress, status = msg
-                    self.progress.set(progress)
-                    self.status_var.set(f"测试中... {status}")
-                
-                elif msg[0] == 'result':
-                    _, name, result, passed = msg
-                    if passed:
-                        self._log(f"✓ {name}", 'pass')
-                    else:
-                        self._log_failure(
-                            name=name,
-                            status=result.status.value,
-                            message=result.message or "",
-                            actual=result.actual_output,
-                            expected=result.expected_output
-                        )
-                
                 elif msg[0] == 'error':
                     _, error_msg = msg
                     self._log(f"✗ 错误: {error_msg}", 'error')
@@ -580,15 +712,38 @@ class TestTab(BaseTab, OutputMixin):
                     _, passed, failed = msg
                     self._log("⏹ 测试已停止", 'warning')
                     self._finish_test(passed, failed, stopped=True)
-                
-        except:
-            pass
+            
+            if pending_progress is not None:
+                self._apply_progress(pending_progress)
+        except Exception as e:
+            # 不能让异常打断轮询链，但也不静默吞掉
+            self._log(f"✗ 消息处理出错: {e!r}", 'error')
+        finally:
+            # 运行中按定时节奏合并写入，结束后立即写出
+            if self.is_running:
+                self._schedule_log_flush()
+            else:
+                self._flush_log()
+        
+        if handled >= self.MAX_MESSAGES_PER_TICK:
+            self.parent.after(10, self.process_queue)
+        return handled > 0
+    
+    def _apply_progress(self, pending):
+        """应用 (百分比, 已完成数, 总数) 进度"""
+        progress, done, total = pending
+        pct = int(progress)
+        if pct > self._last_progress_pct:
+            self.progress.set(pct)
+            self._last_progress_pct = pct
+        self.status_var.set(f"测试中... {done}/{total}")
     
     def _finish_test(self, passed: int, failed: int, stopped: bool = False):
         """完成测试"""
         self.is_running = False
         self.stop_btn.configure(state=tk.DISABLED)
         self.progress.set(100)
+        self._last_progress_pct = 100
         
         total = passed + failed
         self.status_var.set("已停止" if stopped else "完成")
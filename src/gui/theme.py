@@ -3,6 +3,8 @@
 """
 import tkinter as tk
 from tkinter import ttk
+from tkinter import font as tkfont
+from functools import lru_cache
 
 
 # 颜色方案 - 清新浅色主题
@@ -53,186 +55,280 @@ COLORS = {
 }
 
 
-def apply_modern_theme(root: tk.Tk):
-    """应用现代化浅色主题"""
-    style = ttk.Style()
-    
-    # 使用 clam 主题作为基础
-    style.theme_use('clam')
-    
-    # 全局配置
-    root.configure(bg=COLORS['bg_secondary'])
-    
+# 界面命名字体：在 apply_modern_theme 中创建一次，控件按名字引用
+FONT_BODY = 'AppBody'
+FONT_BODY_BOLD = 'AppBodyBold'
+FONT_HEADER = 'AppHeader'
+FONT_TAB = 'AppTab'
+FONT_TITLE = 'AppTitle'
+
+_UI_FONT_FAMILY = '微软雅黑'
+_NAMED_FONTS = {
+    FONT_BODY: (9, 'normal'),
+    FONT_BODY_BOLD: (9, 'bold'),
+    FONT_HEADER: (10, 'bold'),
+    FONT_TAB: (10, 'normal'),
+    FONT_TITLE: (14, 'bold'),
+}
+# 持有 Font 对象，避免被回收时连带删除 Tk 中的命名字体
+_font_objects = {}
+
+
+def _create_named_fonts(root: tk.Tk):
+    """创建（或重设）界面命名字体"""
+    for name, (size, weight) in _NAMED_FONTS.items():
+        try:
+            font = tkfont.Font(root, name=name, family=_UI_FONT_FAMILY,
+                               size=size, weight=weight, exists=False)
+        except tk.TclError:
+            font = tkfont.Font(root, name=name, exists=True)
+            font.configure(family=_UI_FONT_FAMILY, size=size, weight=weight)
+        _font_objects[name] = font
+
+
+# ttk 样式表：(样式名, configure 参数)，按顺序应用
+_STYLE_CONFIGS = (
     # Frame
-    style.configure('TFrame', background=COLORS['bg_secondary'])
-    style.configure('Card.TFrame', background=COLORS['bg_card'])
+    ('TFrame', {'background': COLORS['bg_secondary']}),
+    ('Card.TFrame', {'background': COLORS['bg_card']}),
     
     # LabelFrame
-    style.configure('TLabelframe', 
-                    background=COLORS['bg_card'],
-                    bordercolor=COLORS['border'],
-                    relief='solid',
-                    borderwidth=1)
-    style.configure('TLabelframe.Label', 
-                    background=COLORS['bg_card'],
-                    foreground=COLORS['fg_primary'],
-                    font=('微软雅黑', 10, 'bold'))
+    ('TLabelframe', {
+        'background': COLORS['bg_card'],
+        'bordercolor': COLORS['border'],
+        'relief': 'solid',
+        'borderwidth': 1,
+    }),
+    ('TLabelframe.Label', {
+        'background': COLORS['bg_card'],
+        'foreground': COLORS['fg_primary'],
+        'font': FONT_HEADER,
+    }),
     
     # Label
-    style.configure('TLabel',
-                    background=COLORS['bg_secondary'],
-                    foreground=COLORS['fg_primary'],
-                    font=('微软雅黑', 9))
-    style.configure('Card.TLabel',
-                    background=COLORS['bg_card'],
-                    foreground=COLORS['fg_primary'])
-    style.configure('Title.TLabel',
-                    background=COLORS['bg_secondary'],
-                    foreground=COLORS['accent'],
-                    font=('微软雅黑', 14, 'bold'))
-    style.configure('Status.TLabel',
-                    background=COLORS['bg_secondary'],
-                    foreground=COLORS['fg_muted'],
-                    font=('微软雅黑', 9))
-    style.configure('Success.TLabel',
-                    background=COLORS['bg_secondary'],
-                    foreground=COLORS['success'],
-                    font=('微软雅黑', 10, 'bold'))
-    style.configure('Error.TLabel',
-                    background=COLORS['bg_secondary'],
-                    foreground=COLORS['error'],
-                    font=('微软雅黑', 10, 'bold'))
+    ('TLabel', {
+        'background': COLORS['bg_secondary'],
+        'foreground': COLORS['fg_primary'],
+        'font': FONT_BODY,
+    }),
+    ('Card.TLabel', {
+        'background': COLORS['bg_card'],
+        'foreground': COLORS['fg_primary'],
+    }),
+    ('Title.TLabel', {
+        'background': COLORS['bg_secondary'],
+        'foreground': COLORS['accent'],
+        'font': FONT_TITLE,
+    }),
+    ('Status.TLabel', {
+        'background': COLORS['bg_secondary'],
+        'foreground': COLORS['fg_muted'],
+        'font': FONT_BODY,
+    }),
+    ('Success.TLabel', {
+        'background': COLORS['bg_secondary'],
+        'foreground': COLORS['success'],
+        'font': FONT_HEADER,
+    }),
+    ('Error.TLabel', {
+        'background': COLORS['bg_secondary'],
+        'foreground': COLORS['error'],
+        'font': FONT_HEADER,
+    }),
     
     # Button - 普通按钮
-    style.configure('TButton',
-                    background=COLORS['btn_bg'],
-                    foreground=COLORS['fg_primary'],
-                    bordercolor=COLORS['border'],
-                    focuscolor=COLORS['accent'],
-                    font=('微软雅黑', 9),
-                    padding=(12, 6))
-    style.map('TButton',
-              background=[('active', COLORS['btn_hover']), 
-                         ('pressed', COLORS['btn_active'])],
-              foreground=[('disabled', COLORS['fg_muted'])])
-    
+    ('TButton', {
+        'background': COLORS['btn_bg'],
+        'foreground': COLORS['fg_primary'],
+        'bordercolor': COLORS['border'],
+        'focuscolor': COLORS['accent'],
+        'font': FONT_BODY,
+        'padding': (12, 6),
+    }),
     # Accent Button - 主要操作按钮
-    style.configure('Accent.TButton',
-                    background=COLORS['accent'],
-                    foreground='#ffffff',
-                    font=('微软雅黑', 9, 'bold'))
-    style.map('Accent.TButton',
-              background=[('active', COLORS['accent_hover']),
-                         ('pressed', COLORS['accent'])])
-    
+    ('Accent.TButton', {
+        'background': COLORS['accent'],
+        'foreground': '#ffffff',
+        'font': FONT_BODY_BOLD,
+    }),
     # Danger Button - 危险操作按钮
-    style.configure('Danger.TButton',
-                    background=COLORS['error'],
-                    foreground='#ffffff',
-                    font=('微软雅黑', 9, 'bold'))
-    style.map('Danger.TButton',
-              background=[('active', '#c92a2a'),
-                         ('pressed', COLORS['error'])])
+    ('Danger.TButton', {
+        'background': COLORS['error'],
+        'foreground': '#ffffff',
+        'font': FONT_BODY_BOLD,
+    }),
     
     # Entry
-    style.configure('TEntry',
-                    fieldbackground=COLORS['input_bg'],
-                    foreground=COLORS['fg_primary'],
-                    bordercolor=COLORS['input_border'],
-                    insertcolor=COLORS['fg_primary'],
-                    padding=6)
-    style.map('TEntry',
-              bordercolor=[('focus', COLORS['border_focus'])])
+    ('TEntry', {
+        'fieldbackground': COLORS['input_bg'],
+        'foreground': COLORS['fg_primary'],
+        'bordercolor': COLORS['input_border'],
+        'insertcolor': COLORS['fg_primary'],
+        'padding': 6,
+    }),
     
     # Combobox
-    style.configure('TCombobox',
-                    fieldbackground=COLORS['input_bg'],
-                    background=COLORS['btn_bg'],
-                    foreground=COLORS['fg_primary'],
-                    bordercolor=COLORS['input_border'],
-                    arrowcolor=COLORS['fg_secondary'],
-                    padding=6)
-    style.map('TCombobox',
-              fieldbackground=[('readonly', COLORS['input_bg'])],
-              bordercolor=[('focus', COLORS['border_focus'])])
+    ('TCombobox', {
+        'fieldbackground': COLORS['input_bg'],
+        'background': COLORS['btn_bg'],
+        'foreground': COLORS['fg_primary'],
+        'bordercolor': COLORS['input_border'],
+        'arrowcolor': COLORS['fg_secondary'],
+        'padding': 6,
+    }),
     
     # Notebook (标签页) - 修复选中时大小变化问题
-    style.configure('TNotebook',
-                    background=COLORS['bg_secondary'],
-                    bordercolor=COLORS['border'],
-                    tabmargins=[4, 4, 4, 0])
-    style.configure('TNotebook.Tab',
-                    background=COLORS['bg_tertiary'],
-                    foreground=COLORS['fg_secondary'],
-                    padding=[16, 8],
-                    font=('微软雅黑', 10))
-    style.map('TNotebook.Tab',
-              background=[('selected', COLORS['bg_card'])],
-              foreground=[('selected', COLORS['accent'])],
-              padding=[('selected', [16, 8])])  # 保持相同的padding
+    ('TNotebook', {
+        'background': COLORS['bg_secondary'],
+        'bordercolor': COLORS['border'],
+        'tabmargins': [4, 4, 4, 0],
+    }),
+    ('TNotebook.Tab', {
+        'background': COLORS['bg_tertiary'],
+        'foreground': COLORS['fg_secondary'],
+        'padding': [16, 8],
+        'font': FONT_TAB,
+    }),
     
     # Progressbar
-    style.configure('TProgressbar',
-                    background=COLORS['accent'],
-                    troughcolor=COLORS['bg_tertiary'],
-                    bordercolor=COLORS['border'],
-                    lightcolor=COLORS['accent'],
-                    darkcolor=COLORS['accent'],
-                    thickness=6)
+    ('TProgressbar', {
+        'background': COLORS['accent'],
+        'troughcolor': COLORS['bg_tertiary'],
+        'bordercolor': COLORS['border'],
+        'lightcolor': COLORS['accent'],
+        'darkcolor': COLORS['accent'],
+        'thickness': 6,
+    }),
     
     # Scrollbar
-    style.configure('TScrollbar',
-                    background=COLORS['bg_tertiary'],
-                    troughcolor=COLORS['bg_secondary'],
-                    bordercolor=COLORS['bg_secondary'],
-                    arrowcolor=COLORS['fg_muted'])
-    style.map('TScrollbar',
-              background=[('active', COLORS['border'])])
+    ('TScrollbar', {
+        'background': COLORS['bg_tertiary'],
+        'troughcolor': COLORS['bg_secondary'],
+        'bordercolor': COLORS['bg_secondary'],
+        'arrowcolor': COLORS['fg_muted'],
+    }),
     
     # PanedWindow
-    style.configure('TPanedwindow',
-                    background=COLORS['bg_secondary'])
+    ('TPanedwindow', {'background': COLORS['bg_secondary']}),
     
     # Separator
-    style.configure('TSeparator',
-                    background=COLORS['border'])
+    ('TSeparator', {'background': COLORS['border']}),
+    ('Card.TSeparator', {'background': COLORS['border_light']}),
+)
+
+# 状态相关样式：(样式名, map 参数)
+_STYLE_MAPS = (
+    ('TButton', {
+        'background': [('active', COLORS['btn_hover']),
+                       ('pressed', COLORS['btn_active'])],
+        'foreground': [('disabled', COLORS['fg_muted'])],
+    }),
+    ('Accent.TButton', {
+        'background': [('active', COLORS['accent_hover']),
+                       ('pressed', COLORS['accent'])],
+    }),
+    ('Danger.TButton', {
+        'background': [('active', '#c92a2a'),
+                       ('pressed', COLORS['error'])],
+    }),
+    ('TEntry', {
+        'bordercolor': [('focus', COLORS['border_focus'])],
+    }),
+    ('TCombobox', {
+        'fieldbackground': [('readonly', COLORS['input_bg'])],
+        'bordercolor': [('focus', COLORS['border_focus'])],
+    }),
+    ('TNotebook.Tab', {
+        'background': [('selected', COLORS['bg_card'])],
+        'foreground': [('selected', COLORS['accent'])],
+        'padding': [('selected', [16, 8])],  # 保持相同的padding
+    }),
+    ('TScrollbar', {
+        'background': [('active', COLORS['border'])],
+    }),
+)
+
+
+def apply_modern_theme(root: tk.Tk):
+    """应用现代化浅色主题"""
+    _create_named_fonts(root)
+    style = ttk.Style()
+    
+    # 使用 clam 主题作为基础
+    style.theme_use('clam')
+    
+    # 全局配置
+    root.configure(bg=COLORS['bg_secondary'])
+    
+    for name, options in _STYLE_CONFIGS:
+        style.configure(name, **options)
+    for name, options in _STYLE_MAPS:
+        style.map(name, **options)
     
     return style
 
 
+_LISTBOX_DEFAULTS = {
+    'bg': COLORS['input_bg'],
+    'fg': COLORS['fg_primary'],
+    'selectbackground': COLORS['select_bg'],
+    'selectforeground': COLORS['select_fg'],
+    'borderwidth': 1,
+    'highlightthickness': 1,
+    'highlightbackground': COLORS['border'],
+    'highlightcolor': COLORS['border_focus'],
+    'relief': 'solid',
+    'activestyle': 'none',
+}
+
+_TEXT_DEFAULTS = {
+    'bg': COLORS['input_bg'],
+    'fg': COLORS['fg_primary'],
+    'insertbackground': COLORS['fg_primary'],
+    'selectbackground': COLORS['select_bg'],
+    'selectforeground': COLORS['select_fg'],
+    'borderwidth': 1,
+    'highlightthickness': 1,
+    'highlightbackground': COLORS['border'],
+    'highlightcolor': COLORS['border_focus'],
+    'relief': 'solid',
+    'padx': 8,
+    'pady': 8,
+}
+
+
 def create_styled_listbox(parent, **kwargs) -> tk.Listbox:
     """创建样式化的Listbox"""
-    default_config = {
-        'bg': COLORS['input_bg'],
-        'fg': COLORS['fg_primary'],
-        'selectbackground': COLORS['select_bg'],
-        'selectforeground': COLORS['select_fg'],
-        'borderwidth': 1,
-        'highlightthickness': 1,
-        'highlightbackground': COLORS['border'],
-        'highlightcolor': COLORS['border_focus'],
-        'relief': 'solid',
-        'activestyle': 'none',
-    }
-    default_config.update(kwargs)
-    return tk.Listbox(parent, **default_config)
+    return tk.Listbox(parent, **{**_LISTBOX_DEFAULTS, **kwargs})
 
 
 def create_styled_text(parent, **kwargs) -> tk.Text:
     """创建样式化的Text"""
-    default_config = {
-        'bg': COLORS['input_bg'],
-        'fg': COLORS['fg_primary'],
-        'insertbackground': COLORS['fg_primary'],
-        'selectbackground': COLORS['select_bg'],
-        'selectforeground': COLORS['select_fg'],
-        'borderwidth': 1,
-        'highlightthickness': 1,
-        'highlightbackground': COLORS['border'],
-        'highlightcolor': COLORS['border_focus'],
-        'relief': 'solid',
-        'padx': 8,
-        'pady': 8,
+    return tk.Text(parent, **{**_TEXT_DEFAULTS, **kwargs})
+
+
+@lru_cache(maxsize=None)
+def output_tag_styles(font: str, size: int) -> dict:
+    """测试输出区的标签样式 {tag: tag_configure 参数}，同一字体只构建一次"""
+    return {
+        'pass': {'foreground': COLORS['success']},
+        'fail': {'foreground': COLORS['error']},
+        'info': {'foreground': COLORS['info']},
+        'warning': {'foreground': COLORS['warning']},
+        'error': {'foreground': COLORS['error'], 'font': (font, size - 1, 'bold')},
+        'header': {'foreground': COLORS['accent'], 'font': (font, size, 'bold')},
+        'dim': {'foreground': COLORS['fg_muted']},
+    }
+
+
+@lru_cache(maxsize=None)
+def chat_tag_styles(font: str, size: int) -> dict:
+    """AI 对话区的标签样式 {tag: tag_configure 参数}，同一字体只构建一次"""
+    return {
+        'user': {'foreground': COLORS['info'], 'font': (font, size, 'bold')},
+        'assistant': {'foreground': COLORS['fg_primary']},
+        'system': {'foreground': COLORS['fg_muted'], 'font': (font, size - 1)},
+        'tool_call': {'foreground': COLORS['warning'], 'font': (font, size - 1)},
+        'tool_result': {'foreground': COLORS['success'], 'background': COLORS['bg_tertiary']},
+        'error': {'foreground': COLORS['error']},
     }
-    default_config.update(kwargs)
-    return tk.Text(parent, **default_config)
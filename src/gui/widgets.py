@@ -3,7 +3,8 @@
 """
 import tkinter as tk
 from tkinter import ttk
-from .theme import COLORS
+from functools import lru_cache
+from .theme import COLORS, FONT_BODY_BOLD, FONT_HEADER
 
 
 class AnimatedProgressBar(ttk.Frame):
@@ -14,51 +15,43 @@ class AnimatedProgressBar(ttk.Frame):
         
         self._value = 0
         self._target = 0
-        self._animating = False
+        # 已安排的动画帧 after id
+        self._pending = None
         
-        # 进度条容器
-        self.container = tk.Canvas(
-            self, height=6, bg=COLORS['bg_tertiary'],
-            highlightthickness=0, bd=0
+        # 原生进度条，由变量驱动重绘（样式见 theme 中的 TProgressbar）
+        self._var = tk.DoubleVar(self, value=0)
+        self.bar = ttk.Progressbar(
+            self, variable=self._var, maximum=100,
+            mode='determinate', style='TProgressbar'
         )
-        self.container.pack(fill=tk.X, padx=1, pady=1)
-        
-        # 进度条填充
-        self.fill = self.container.create_rectangle(
-            0, 0, 0, 6, fill=COLORS['accent'], outline=''
-        )
-        
-        self.bind('<Configure>', self._on_resize)
-    
-    def _on_resize(self, event=None):
-        """调整大小时更新"""
-        self._update_fill()
+        self.bar.pack(fill=tk.X, padx=1, pady=1)
     
     def _update_fill(self):
         """更新填充"""
-        width = self.container.winfo_width()
-        fill_width = int(width * self._value / 100)
-        self.container.coords(self.fill, 0, 0, fill_width, 6)
+        self._var.set(self._value)
     
     def set(self, value: float):
         """设置进度值（带动画）"""
-        self._target = max(0, min(100, value))
-        if not self._animating:
-            self._animate()
+        target = max(0, min(100, value))
+        if target == self._target:
+            return
+        self._target = target
+        # 同一时刻只保留一个待执行的动画帧
+        if self._pending is None:
+            self._pending = self.after(16, self._tick)
     
-    def _animate(self):
-        """动画更新"""
-        if abs(self._value - self._target) < 0.5:
+    def _tick(self):
+        """动画帧（~60fps）"""
+        self._pending = None
+        # 缓动是渐近的，差距不足 1% 时直接落到目标值；
+        # 不可见（如切到其他标签页）时也不再逐帧动画，直接落位
+        if abs(self._value - self._target) < 1 or not self.winfo_viewable():
             self._value = self._target
-            self._update_fill()
-            self._animating = False
-            return
-        
-        self._animating = True
-        diff = self._target - self._value
-        self._value += diff * 0.2  # 缓动
+        else:
+            self._value += (self._target - self._value) * 0.2  # 缓动
         self._update_fill()
-        self.after(16, self._animate)  # ~60fps
+        if self._value != self._target:
+            self._pending = self.after(16, self._tick)
 
 
 class IconButton(ttk.Button):
@@ -78,32 +71,36 @@ class IconButton(ttk.Button):
     }
     
     def __init__(self, parent, icon: str = None, text: str = '', **kwargs):
-        display_text = ''
-        if icon and icon in self.ICONS:
-            display_text = self.ICONS[icon]
+        super().__init__(parent, text=self._compose(icon, text), **kwargs)
+    
+    @classmethod
+    @lru_cache(maxsize=64)
+    def _compose(cls, icon: str, text: str) -> str:
+        """拼接图标与文字（同一组合只拼一次）"""
+        glyph = cls.ICONS.get(icon, '') if icon else ''
         if text:
-            display_text = f"{display_text} {text}" if display_text else text
-        
-        super().__init__(parent, text=display_text, **kwargs)
+            return f"{glyph} {text}" if glyph else text
+        return glyph
 
 
 class StatusBadge(ttk.Frame):
     """状态徽章"""
     
+    _STATUS_FG = {
+        'success': COLORS['success'],
+        'error': COLORS['error'],
+        'warning': COLORS['warning'],
+        'info': COLORS['info'],
+    }
+    _DEFAULT_FG = COLORS['fg_primary']
+    
     def __init__(self, parent, text: str = '', status: str = 'info'):
         super().__init__(parent)
         
-        colors = {
-            'success': COLORS['success'],
-            'error': COLORS['error'],
-            'warning': COLORS['warning'],
-            'info': COLORS['info'],
-        }
-        
         self.label = ttk.Label(
             self, text=text,
-            foreground=colors.get(status, COLORS['fg_primary']),
-            font=('微软雅黑', 9, 'bold')
+            foreground=self._STATUS_FG.get(status, self._DEFAULT_FG),
+            font=FONT_BODY_BOLD
         )
         self.label.pack(padx=8, pady=2)
     
@@ -111,13 +108,7 @@ class StatusBadge(ttk.Frame):
         self.label.configure(text=text)
     
     def set_status(self, status: str):
-        colors = {
-            'success': COLORS['success'],
-            'error': COLORS['error'],
-            'warning': COLORS['warning'],
-            'info': COLORS['info'],
-        }
-        self.label.configure(foreground=colors.get(status, COLORS['fg_primary']))
+        self.label.configure(foreground=self._STATUS_FG.get(status, self._DEFAULT_FG))
 
 
 class Card(ttk.Frame):
@@ -130,11 +121,11 @@ class Card(ttk.Frame):
             title_label = ttk.Label(
                 self, text=title,
                 style='Card.TLabel',
-                font=('微软雅黑', 10, 'bold')
+                font=FONT_HEADER
             )
             title_label.pack(anchor=tk.W, padx=12, pady=(12, 8))
             
-            sep = ttk.Separator(self, orient=tk.HORIZONTAL)
+            sep = ttk.Separator(self, orient=tk.HORIZONTAL, style='Card.TSeparator')
             sep.pack(fill=tk.X, padx=12)
         
         self.content = ttk.Frame(self, style='Card.TFrame')
@@ -1,23 +1,32 @@
 """
 数据模型模块
 """
+import sys
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 from typing import Optional
 
 
-class TestStatus(Enum):
-    """测试状态"""
+# 用例和结果会成百上千地创建：3.10+ 使用 __slots__ 省去每个实例的 __dict__
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+class TestStatus(str, Enum):
+    """测试状态（成员本身即显示文本）"""
     PASSED = "通过"
     FAILED = "失败(WA)"
     COMPILE_ERROR = "编译错误(RE)"
     RUNTIME_ERROR = "运行错误(OCE)"
     TIMEOUT = "超时(WA or TLE)"
     SKIPPED = "跳过(Report by ISSUE or fix it and PR)"
+    
+    def __str__(self) -> str:
+        # 各 Python 版本下 str()/f-string 都得到显示文本
+        return self.value
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class TestResult:
     """测试结果"""
     status: TestStatus
@@ -33,7 +42,7 @@ class TestResult:
         return self.status == TestStatus.PASSED
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class TestCase:
     """测试用例"""
     name: str
@@ -3,9 +3,9 @@
 """
 import subprocess
 import shutil
-import json
 import os
 import hashlib
+import locale
 from pathlib import Path
 from typing import Optional, Tuple, List
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -23,6 +23,94 @@ SUPPORTED_LANGUAGES = {"java", "c", "cpp"}
 # 指令类型显示顺序
 _CYCLE_BREAKDOWN_ORDER = ["Division", "Multiply", "Jump/Branch", "Memory", "Others"]
 
+# 子进程输出的解码方式（与 subprocess 的 text=True 一致）
+_OUTPUT_ENCODING = locale.getpreferredencoding(False)
+
+# Mars 每个用例启动一次 JVM：启用类数据共享加快启动，
+# 串行 GC 避免并行测试时每个 JVM 各开一组 GC 线程
+_MARS_JVM_ARGS = ["-Xshare:auto", "-XX:+UseSerialGC"]
+
+# tools.jvm_fast_startup 开启时追加：运行时间很短，只用 C1 编译省去 C2 的开销
+_JVM_FAST_STARTUP_ARGS = ["-XX:TieredStopAtLevel=1"]
+
+# 源文件较多时把 javac 拆成多个分片并发执行
+_JAVAC_FILES_PER_SHARD = 64
+
+# g++ 参考程序缓存保留的最大数量（按最近使用时间淘汰；仓库自带用例约一千个）
+_GCC_CACHE_SIZE = 1024
+
+
+def _decode(data: Optional[bytes], encoding: str = _OUTPUT_ENCODING) -> str:
+    """解码子进程输出（只在需要展示时调用），换行统一为 \\n"""
+    if not data:
+        return ""
+    return data.decode(encoding, errors="replace").replace("\r\n", "\n")
+
+
+def _find_files(root: Path, exts: Tuple[str, ...]) -> List[str]:
+    """递归查找 root 下指定扩展名的文件，返回路径字符串（os.scandir 遍历，不构造 Path）"""
+    exts = tuple(os.path.normcase(ext) for ext in exts)
+    found = []
+    stack = [str(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif os.path.normcase(entry.name).endswith(exts):
+                        found.append(entry.path)
+        except OSError:
+            continue
+    return found
+
+
+def _sources_digest(files: List[str], command: List[str]) -> str:
+    """源码指纹：构建命令 + 每个文件的 (路径, mtime, 大小)"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update("\0".join(command).encode("utf-8", "surrogateescape"))
+    for path in sorted(files):
+        st = os.stat(path)
+        h.update(f"\n{path}\0{st.st_mtime_ns}\0{st.st_size}".encode("utf-8", "surrogateescape"))
+    return h.hexdigest()
+
+
+def _cmake_exe_candidates(build_dir: Path) -> List[Path]:
+    """CMake 构建产物的常见位置（单配置生成器在根目录，多配置生成器在 Release/ 下）"""
+    names = ("Compiler.exe", "compiler.exe", "Compiler", "compiler")
+    return [d / name for d in (build_dir, build_dir / "Release") for name in names]
+
+
+def _stage_testfile(source_file: Path, target: Path) -> None:
+    """把测试源码放到 target：已是 UTF-8 + LF 时直接硬链接，否则写入规范化后的副本"""
+    if target.exists() or target.is_symlink():
+        target.unlink()
+    
+    data = source_file.read_bytes()
+    if b"\r" not in data:
+        try:
+            data.decode("utf-8")
+        except UnicodeDecodeError:
+            pass
+        else:
+            try:
+                os.link(source_file, target)
+                return
+            except OSError:
+                # 跨文件系统等情况无法硬链接，直接写出原字节
+                target.write_bytes(data)
+                return
+    
+    with open(target, "w", encoding="utf-8", newline="\n") as f:
+        f.write(read_file_safe(source_file))
+
+
+def _open_stdin(input_file: Optional[Path]):
+    """打开输入文件作为子进程 stdin；无输入时返回空设备"""
+    if input_file and input_file.exists():
+        return open(input_file, "rb")
+    return open(os.devnull, "rb")
+
 
 @dataclass
 class CompilerConfig:
@@ -66,12 +154,44 @@ class CompilerTester:
         self.compiler_jar = self.work_dir / "Compiler.jar"  # Java
         self.compiler_exe = self.work_dir / "Compiler.exe"  # C/C++
         
+        # 每个用例都会用到的命令行，创建时拼好
+        tools = self.config.tools
+        self._gcc = tools.get_gcc()
+        fast_args = _JVM_FAST_STARTUP_ARGS if tools.jvm_fast_startup else []
+        mars_args = _MARS_JVM_ARGS + fast_args
+        cds_archive = tools.get_mars_cds_archive()
+        if cds_archive:
+            cds_path = Path(cds_archive)
+            if not cds_path.is_absolute():
+                cds_path = (self.test_dir / cds_path).resolve()
+            if cds_path.exists():
+                mars_args = mars_args + [f"-XX:SharedArchiveFile={cds_path}"]
+        self._mars_cmd = [tools.get_java(), *mars_args, "-jar", str(self.mars_jar), "nc"]
+        if self.compiler_config.language == "java":
+            compiler_args = _MARS_JVM_ARGS + fast_args if tools.jvm_fast_startup else []
+            self._compiler_cmd = [tools.get_java(), *compiler_args, "-jar", str(self.compiler_jar)]
+        else:
+            self._compiler_cmd = [str(self.compiler_exe)]
+        
         # 线程本地存储
         self._local = threading.local()
         # 线程 -> worker_id 映射，避免并行线程复用同一 worker 目录导致互相覆盖
         self._worker_id_lock = threading.Lock()
         self._thread_worker_ids = {}
         self._next_worker_id = 0
+        # 已确认存在的 worker 目录编号
+        self._created_worker_dirs = set()
+        # 正在运行的测试子进程，停止时统一结束
+        self._stop_event = threading.Event()
+        self._procs_lock = threading.Lock()
+        self._procs = set()
+        # c_header 的预编译头，首个 g++ 用例时生成
+        self._gcc_header_lock = threading.Lock()
+        self._gcc_header_checked = False
+        self._gcc_header: Optional[Path] = None
+        self._gcc_cache_lock = threading.Lock()
+        # test_parallel 期间已确认编译产物存在，单个用例不再重复检查
+        self._compiler_ready_cached: Optional[bool] = None
 
     def _get_thread_worker_id(self, max_workers: int) -> int:
         """为当前线程分配一个稳定的 worker_id（0..max_workers-1）。
@@ -94,6 +214,34 @@ class CompilerTester:
             self._thread_worker_ids[tid] = worker_id
             return worker_id
     
+    def _run(self, cmd: List[str], timeout: float, **kwargs) -> subprocess.CompletedProcess:
+        """可中断的 subprocess.run：运行期间登记子进程，terminate_running 时被结束"""
+        with subprocess.Popen(cmd, **kwargs) as proc:
+            with self._procs_lock:
+                self._procs.add(proc)
+            try:
+                if self._stop_event.is_set():
+                    proc.kill()
+                stdout, stderr = proc.communicate(timeout=timeout)
+            except BaseException:
+                proc.kill()
+                raise
+            finally:
+                with self._procs_lock:
+                    self._procs.discard(proc)
+        return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+    
+    def terminate_running(self):
+        """结束所有正在运行的测试子进程（可从任意线程调用）"""
+        self._stop_event.set()
+        with self._procs_lock:
+            procs = list(self._procs)
+        for proc in procs:
+            try:
+                proc.kill()
+            except OSError:
+                pass
+    
     def _load_compiler_config(self) -> CompilerConfig:
         """从编译器项目读取config.json"""
         config_path = self.project_dir / "src" / "config.json"
@@ -102,6 +250,7 @@ class CompilerTester:
             config_path = self.project_dir / "config.json"
         
         if config_path.exists():
+            import json  # 延迟导入，只有这里用到
             try:
                 with open(config_path, 'r', encoding='utf-8') as f:
                     data = json.load(f)
@@ -118,11 +267,27 @@ class CompilerTester:
         return self.compiler_config.language
     
     def _get_worker_dir(self, worker_id: int) -> Path:
-        """获取工作线程的独立目录"""
+        """获取工作线程的独立目录（每个目录只在首次使用时创建）"""
         worker_dir = self.work_dir / f"worker_{worker_id}"
-        worker_dir.mkdir(parents=True, exist_ok=True)
+        if worker_id not in self._created_worker_dirs:
+            worker_dir.mkdir(parents=True, exist_ok=True)
+            self._created_worker_dirs.add(worker_id)
         return worker_dir
     
+    @staticmethod
+    def _build_is_current(target: Path, digest: str) -> bool:
+        """产物存在且记录的源码指纹一致时无需重新构建"""
+        meta = target.with_name(target.name + ".meta")
+        try:
+            return target.exists() and meta.read_text(encoding="utf-8") == digest
+        except OSError:
+            return False
+    
+    @staticmethod
+    def _record_build(target: Path, digest: str):
+        """记录本次构建的源码指纹"""
+        target.with_name(target.name + ".meta").write_text(digest, encoding="utf-8")
+    
     def compile_project(self) -> Tuple[bool, str]:
         """根据语言编译项目"""
         lang = self.compiler_config.language
@@ -141,7 +306,7 @@ class CompilerTester:
         if not self.project_src_dir.exists():
             return False, f"找不到源码目录: {self.project_src_dir}"
         
-        java_files = list(self.project_src_dir.rglob("*.java"))
+        java_files = _find_files(self.project_src_dir, (".java",))
         if not java_files:
             return False, "找不到Java源文件"
         
@@ -152,14 +317,15 @@ class CompilerTester:
         tools = self.config.tools
         
         try:
-            # 1. 编译 Java 文件
-            cmd = [tools.get_javac(), "-encoding", "UTF-8", "-d", str(build_dir)] + [str(f) for f in java_files]
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, errors="replace",
-                timeout=self.config.timeout.java_compile
-            )
-            if result.returncode != 0:
-                return False, f"编译失败:\n{result.stderr}"
+            # 1. 编译 Java 文件（源码与上次构建相同则跳过）
+            javac_cmd = [tools.get_javac(), "-encoding", "UTF-8", "-d", str(build_dir)]
+            digest = _sources_digest(java_files, javac_cmd)
+            if self._build_is_current(self.compiler_jar, digest):
+                return True, "[Java] 源码未修改，沿用 Compiler.jar"
+            
+            ok, stderr = self._run_javac(javac_cmd, java_files)
+            if not ok:
+                return False, f"编译失败:\n{_decode(stderr)}"
             
             # 2. 创建 MANIFEST.MF
             manifest_path = build_dir / "MANIFEST.MF"
@@ -167,10 +333,11 @@ class CompilerTester:
             
             # 3. 打包为 jar
             jar_cmd = [tools.get_jar(), "cfm", str(self.compiler_jar), str(manifest_path), "-C", str(build_dir), "."]
-            jar_result = subprocess.run(jar_cmd, capture_output=True, text=True, errors="replace", timeout=30)
+            jar_result = subprocess.run(jar_cmd, capture_output=True, timeout=30)
             if jar_result.returncode != 0:
-                return False, f"打包jar失败:\n{jar_result.stderr}"
+                return False, f"打包jar失败:\n{_decode(jar_result.stderr)}"
             
+            self._record_build(self.compiler_jar, digest)
             return True, f"[Java] 成功编译 {len(java_files)} 个文件 -> Compiler.jar"
         
         except subprocess.TimeoutExpired:
@@ -180,6 +347,32 @@ class CompilerTester:
         except Exception as e:
             return False, str(e)
     
+    def _run_javac(self, base_cmd: List[str], java_files: List[str]) -> Tuple[bool, bytes]:
+        """执行 javac；文件较多时按 CPU 数分片并发编译到同一输出目录
+        
+        分片通过 -sourcepath 解析其他分片中的类，-implicit:none 保证每个
+        .class 只由其所在分片写出，避免并发写同一文件。
+        -sourcepath 只按文件名查找类（找不到非 public 的次要顶层类、
+        包名与目录不符的类），任一分片失败时整体重新编译一次，以其结果为准。
+        """
+        timeout = self.config.timeout.java_compile
+        shards = min(os.cpu_count() or 1, len(java_files) // _JAVAC_FILES_PER_SHARD + 1)
+        if shards > 1 and self._run_javac_sharded(base_cmd, java_files, shards, timeout):
+            return True, b""
+        
+        result = subprocess.run(base_cmd + java_files, capture_output=True, timeout=timeout)
+        return result.returncode == 0, result.stderr
+    
+    def _run_javac_sharded(self, base_cmd: List[str], java_files: List[str], shards: int, timeout: int) -> bool:
+        """分片并发执行 javac，全部成功返回 True"""
+        shard_cmd = base_cmd + ["-sourcepath", str(self.project_src_dir), "-implicit:none"]
+        with ThreadPoolExecutor(max_workers=shards) as executor:
+            results = list(executor.map(
+                lambda chunk: subprocess.run(shard_cmd + chunk, capture_output=True, timeout=timeout),
+                [java_files[i::shards] for i in range(shards)]
+            ))
+        return all(r.returncode == 0 for r in results)
+    
     def compile_c_cpp_project(self) -> Tuple[bool, str]:
         """编译C/C++编译器项目为可执行文件"""
         if not self.project_src_dir.exists():
@@ -195,7 +388,7 @@ class CompilerTester:
         
         if cmake_lists is not None:
             self.work_dir.mkdir(parents=True, exist_ok=True)
-            project_key = hashlib.md5(str(self.project_dir).encode("utf-8")).hexdigest()[:8]
+            project_key = hashlib.blake2b(os.fsencode(self.project_dir), digest_size=4).hexdigest()
             build_dir = self.work_dir / f"cmake_build_{project_key}"
             build_dir.mkdir(parents=True, exist_ok=True)
             cache_path = build_dir / "CMakeCache.txt"
@@ -280,11 +473,11 @@ class CompilerTester:
                 
                 if not cache_path.exists():
                     configure_result = subprocess.run(
-                        configure_cmd, capture_output=True, text=True, encoding="utf-8", errors="replace",
+                        configure_cmd, capture_output=True,
                         timeout=self.config.timeout.cmake_configure, env=env
                     )
                     if configure_result.returncode != 0:
-                        combined = f"{configure_result.stderr}\n{configure_result.stdout}"
+                        combined = f"{_decode(configure_result.stderr, 'utf-8')}\n{_decode(configure_result.stdout, 'utf-8')}"
                         combined_lower = combined.lower()
                         needs_compiler = (
                             "no cmake_c_compiler could be found" in combined_lower
@@ -336,11 +529,7 @@ class CompilerTester:
                                     f"{combined}"
                                 )
                             
-                            try:
-                                if build_dir.exists():
-                                    shutil.rmtree(build_dir)
-                            except Exception:
-                                pass
+                            shutil.rmtree(build_dir, ignore_errors=True)
                             build_dir.mkdir(parents=True, exist_ok=True)
                             cache_path = build_dir / "CMakeCache.txt"
                             
@@ -356,11 +545,11 @@ class CompilerTester:
                                 retry_configure_cmd.append(f"-DCMAKE_C_COMPILER={fallback_cc}")
                             
                             retry_configure = subprocess.run(
-                                retry_configure_cmd, capture_output=True, text=True, encoding="utf-8", errors="replace",
+                                retry_configure_cmd, capture_output=True,
                                 timeout=self.config.timeout.cmake_configure
                             )
                             if retry_configure.returncode != 0:
-                                return False, f"CMake配置失败:\n{retry_configure.stderr}\n{retry_configure.stdout}"
+                                return False, f"CMake配置失败:\n{_decode(retry_configure.stderr, 'utf-8')}\n{_decode(retry_configure.stdout, 'utf-8')}"
                             
                         else:
                             return False, f"CMake配置失败:\n{combined}"
@@ -373,28 +562,33 @@ class CompilerTester:
                 if parallel > 1:
                     build_cmd += ["--parallel", str(parallel)]
                 build_result = subprocess.run(
-                    build_cmd, capture_output=True, text=True, encoding="utf-8", errors="replace",
+                    build_cmd, capture_output=True,
                     timeout=self.config.timeout.cmake_build, env=env
                 )
                 if build_result.returncode != 0:
-                    return False, f"CMake构建失败:\n{build_result.stderr}\n{build_result.stdout}"
+                    return False, f"CMake构建失败:\n{_decode(build_result.stderr, 'utf-8')}\n{_decode(build_result.stdout, 'utf-8')}"
                 
-                exes = [
-                    p for p in build_dir.rglob("*.exe")
-                    if "CMakeFiles" not in p.parts and p.is_file()
-                ]
-                if not exes:
-                    return False, f"CMake构建完成但未找到可执行文件: {build_dir}"
-                
-                preferred = [p for p in exes if p.name.lower() in ("compiler.exe", "compiler")]
-                if preferred:
-                    chosen = preferred[0]
-                elif len(exes) == 1:
-                    chosen = exes[0]
-                else:
-                    chosen = max(exes, key=lambda p: p.stat().st_mtime)
+                # 先查常见的输出位置，找不到再遍历整个构建目录
+                chosen = next((p for p in _cmake_exe_candidates(build_dir) if p.is_file()), None)
+                if chosen is None:
+                    exes = [
+                        p for p in build_dir.rglob("*.exe")
+                        if "CMakeFiles" not in p.parts and p.is_file()
+                    ]
+                    if not exes:
+                        return False, f"CMake构建完成但未找到可执行文件: {build_dir}"
+                    
+                    preferred = [p for p in exes if p.name.lower() in ("compiler.exe", "compiler")]
+                    if preferred:
+                        chosen = preferred[0]
+                    elif len(exes) == 1:
+                        chosen = exes[0]
+                    else:
+                        chosen = max(exes, key=lambda p: p.stat().st_mtime)
                 
                 shutil.copy2(chosen, self.compiler_exe)
+                # CMake 自身增量构建；清掉直接编译留下的指纹，避免之后误判为最新
+                self.compiler_exe.with_name(self.compiler_exe.name + ".meta").unlink(missing_ok=True)
                 return True, f"[{lang.upper()}] CMake构建成功 -> {chosen.name}"
             
             except subprocess.TimeoutExpired:
@@ -405,12 +599,10 @@ class CompilerTester:
             except Exception as e:
                 return False, str(e)
         
-        ext = ".c" if lang == "c" else ".cpp"
-        source_files = list(self.project_src_dir.rglob(f"*{ext}"))
-        
-        # 如果是cpp也包含.c文件
-        if lang == "cpp":
-            source_files.extend(self.project_src_dir.rglob("*.c"))
+        # 如果是cpp也包含.c文件；头文件只参与源码指纹
+        exts = (".c",) if lang == "c" else (".cpp", ".c")
+        all_files = _find_files(self.project_src_dir, exts + (".h", ".hpp"))
+        source_files = [f for f in all_files if os.path.normcase(f).endswith(exts)]
         
         if not source_files:
             return False, f"找不到{lang.upper()}源文件"
@@ -420,17 +612,22 @@ class CompilerTester:
         
         try:
             # 编译
-            cmd = [gcc, "-o", str(self.compiler_exe)] + [str(f) for f in source_files]
+            cmd = [gcc, "-o", str(self.compiler_exe)] + source_files
             if lang == "cpp":
                 cmd.insert(1, "-std=c++17")
             
+            digest = _sources_digest(all_files, cmd)
+            if self._build_is_current(self.compiler_exe, digest):
+                return True, f"[{lang.upper()}] 源码未修改，沿用 Compiler.exe"
+            
             result = subprocess.run(
-                cmd, capture_output=True, text=True, errors="replace",
+                cmd, capture_output=True,
                 timeout=self.config.timeout.gcc_compile
             )
             if result.returncode != 0:
-                return False, f"编译失败:\n{result.stderr}"
+                return False, f"编译失败:\n{_decode(result.stderr)}"
             
+            self._record_build(self.compiler_exe, digest)
             return True, f"[{lang.upper()}] 成功编译 {len(source_files)} 个文件 -> Compiler.exe"
         
         except subprocess.TimeoutExpired:
@@ -445,35 +642,28 @@ class CompilerTester:
         testfile_path = worker_dir / "testfile.txt"
         mips_path = worker_dir / "mips.txt"
         
-        # 写入 testfile.txt
-        content = read_file_safe(source_file)
-        with open(testfile_path, "w", encoding="utf-8", newline="\n") as f:
-            f.write(content)
+        # 准备 testfile.txt
+        _stage_testfile(source_file, testfile_path)
         
         # 清理旧的 mips.txt
-        if mips_path.exists():
-            mips_path.unlink()
+        mips_path.unlink(missing_ok=True)
         
         # 根据语言选择运行方式
-        lang = self.compiler_config.language
-        tools = self.config.tools
-        
-        if lang == "java":
+        if self.compiler_config.language == "java":
             if not self.compiler_jar.exists():
                 return False, "Compiler.jar不存在，请先编译项目"
-            cmd = [tools.get_java(), "-jar", str(self.compiler_jar)]
         else:  # c/cpp
             if not self.compiler_exe.exists():
                 return False, "Compiler.exe不存在，请先编译项目"
-            cmd = [str(self.compiler_exe)]
         
         try:
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, errors="replace",
-                timeout=self.config.timeout.compile, cwd=str(worker_dir)
+            result = self._run(
+                self._compiler_cmd, timeout=self.config.timeout.compile,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                cwd=str(worker_dir)
             )
             if result.returncode != 0:
-                return False, f"编译器错误:\n{result.stderr}\n{result.stdout}"
+                return False, f"编译器错误:\n{_decode(result.stderr)}\n{_decode(result.stdout)}"
             if not mips_path.exists():
                 return False, "编译器未生成mips.txt"
             return True, ""
@@ -528,62 +718,149 @@ class CompilerTester:
 
         return int(final_cycle), breakdown
      
-    def _run_mars(self, input_file: Optional[Path], worker_dir: Path) -> Tuple[Optional[str], str]:
-        """运行Mars模拟器"""
+    def _run_mars(self, input_file: Optional[Path], worker_dir: Path) -> Tuple[Optional[bytes], str]:
+        """运行Mars模拟器（返回原始字节输出，解码留到需要展示时）"""
         mips_path = worker_dir / "mips.txt"
-        tools = self.config.tools
-        cmd = [tools.get_java(), "-jar", str(self.mars_jar), "nc", str(mips_path)]
-        
-        input_data = ""
-        if input_file and input_file.exists():
-            input_data = read_file_safe(input_file)
+        cmd = self._mars_cmd + [str(mips_path)]
         
         try:
-            result = subprocess.run(
-                cmd, input=input_data, capture_output=True, text=True, errors="replace",
-                timeout=self.config.timeout.mars, cwd=str(worker_dir)
-            )
+            # 输入文件直接作为 stdin，stderr 不使用：只剩 stdout 一个管道
+            with _open_stdin(input_file) as stdin:
+                result = self._run(
+                    cmd, timeout=self.config.timeout.mars,
+                    stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                    cwd=str(worker_dir)
+                )
             return result.stdout, ""
         except subprocess.TimeoutExpired:
             return None, "Mars执行超时"
         except Exception as e:
             return None, str(e)
     
-    def _run_gcc(self, source_file: Path, input_file: Optional[Path], worker_dir: Path) -> Tuple[Optional[str], str]:
-        """使用g++编译运行获取期望结果"""
+    def _evict_gcc_cache(self) -> None:
+        """淘汰最久未使用的 g++ 缓存，保留 _GCC_CACHE_SIZE 个"""
+        if not self._gcc_cache_lock.acquire(blocking=False):
+            return  # 其他线程正在淘汰
+        try:
+            with os.scandir(self.work_dir / "gcc_cache") as it:
+                cached = [(entry.stat().st_mtime_ns, entry.path) for entry in it if entry.name.endswith(".exe")]
+            if len(cached) <= _GCC_CACHE_SIZE:
+                return
+            cached.sort(reverse=True)
+            for _, path in cached[_GCC_CACHE_SIZE:]:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass  # Windows 上可能正被其他线程运行
+        except OSError:
+            pass
+        finally:
+            self._gcc_cache_lock.release()
+    
+    def _get_gcc_header(self) -> Optional[Path]:
+        """返回已预编译的 c_header 头文件路径，不可用时返回 None（回落为拼接源码）"""
+        if not self._gcc_header_checked:
+            with self._gcc_header_lock:
+                if not self._gcc_header_checked:
+                    self._gcc_header = self._build_gcc_header()
+                    self._gcc_header_checked = True
+        return self._gcc_header
+    
+    def _build_gcc_header(self) -> Optional[Path]:
+        """把 c_header 写成 oracle_<hash>.h 并用 g++ 预编译为同名 .gch
+        
+        头文件与用例源码用同一个驱动程序、同样的参数编译，语言（C/C++）一致；
+        .gch 失效时 g++ 会自动改为读取 .h 本身，结果不受影响。
+        """
+        c_header = self.config.c_header
+        if not c_header.strip():
+            return None
+        
+        gcc = self._gcc
+        key = hashlib.blake2b(f"{gcc}\0{c_header}".encode("utf-8"), digest_size=8).hexdigest()
+        pch_dir = self.work_dir / "gcc_pch"
+        header_path = pch_dir / f"oracle_{key}.h"
+        gch_path = pch_dir / f"oracle_{key}.h.gch"
+        if header_path.exists() and gch_path.exists():
+            return header_path
+        
+        try:
+            pch_dir.mkdir(parents=True, exist_ok=True)
+            with open(header_path, "w", encoding="utf-8", newline="\n") as f:
+                f.write(c_header)
+            result = subprocess.run(
+                [gcc, str(header_path), "-o", str(gch_path)],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                timeout=self.config.timeout.gcc_compile
+            )
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return header_path if result.returncode == 0 else None
+    
+    def _run_gcc(self, source_file: Path, input_file: Optional[Path], worker_dir: Path) -> Tuple[Optional[bytes], str]:
+        """使用g++编译运行获取期望结果（返回原始字节输出）
+        
+        可执行文件按 (编译器, 完整源码) 的哈希缓存在 .tmp/gcc_cache，源码不变时不再重复编译
+        """
         tmp_src = worker_dir / "tmp_test.c"
         tmp_exe = worker_dir / "tmp_test.exe"
         
         source_code = read_file_safe(source_file)
-        full_code = self.config.c_header + source_code
+        c_header = self.config.c_header
         
-        tools = self.config.tools
-        gcc = tools.get_gcc()
+        gcc = self._gcc
+        
+        key = hashlib.blake2b(f"{gcc}\0{c_header}{source_code}".encode("utf-8"), digest_size=16).hexdigest()
+        cache_dir = self.work_dir / "gcc_cache"
+        exe = cache_dir / f"{key}.exe"
         
         try:
-            with open(tmp_src, "w", encoding="utf-8", newline="\n") as f:
-                f.write(full_code)
-            
-            # 编译
-            compile_result = subprocess.run(
-                [gcc, str(tmp_src), "-o", str(tmp_exe)],
-                capture_output=True, text=True, errors="replace",
-                timeout=self.config.timeout.gcc_compile
-            )
+            try:
+                # 命中时更新 mtime，作为 LRU 淘汰依据（同时充当存在性检查）
+                os.utime(exe)
+                cached = True
+            except FileNotFoundError:
+                cached = False
             
-            if compile_result.returncode != 0:
-                error_msg = compile_result.stderr or compile_result.stdout or "(无错误信息)"
-                return None, f"g++编译失败:\n{error_msg}"
+            if not cached:
+                # 有预编译头时只写用例源码，头文件通过 -include 引入
+                header = self._get_gcc_header()
+                with open(tmp_src, "w", encoding="utf-8", newline="\n") as f:
+                    if header is None:
+                        f.write(c_header)
+                    f.write(source_code)
+                
+                cmd = [gcc, str(tmp_src), "-o", str(tmp_exe)]
+                if header is not None:
+                    cmd[1:1] = ["-include", str(header)]
+                
+                # 编译
+                compile_result = self._run(
+                    cmd,
+                    timeout=self.config.timeout.gcc_compile,
+                    stdout=subprocess.PIPE, stderr=subprocess.PIPE
+                )
+                
+                if compile_result.returncode != 0:
+                    error_msg = _decode(compile_result.stderr) or _decode(compile_result.stdout) or "(无错误信息)"
+                    return None, f"g++编译失败:\n{error_msg}"
+                
+                # 原子放入缓存；其他线程已放入同名文件（可能正在运行）时直接用本次结果
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.replace(tmp_exe, exe)
+                except OSError:
+                    if not exe.exists():
+                        exe = tmp_exe
+                else:
+                    self._evict_gcc_cache()
             
             # 运行
-            input_data = ""
-            if input_file and input_file.exists():
-                input_data = read_file_safe(input_file)
-            
-            run_result = subprocess.run(
-                [str(tmp_exe)], input=input_data, capture_output=True, text=True, errors="replace",
-                timeout=self.config.timeout.gcc_run
-            )
+            with _open_stdin(input_file) as stdin:
+                run_result = self._run(
+                    [str(exe)], timeout=self.config.timeout.gcc_run,
+                    stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+                )
             
             return run_result.stdout, ""
             
@@ -594,7 +871,7 @@ class CompilerTester:
         except Exception as e:
             return None, str(e)
         finally:
-            # 清理临时文件
+            # 清理临时文件（缓存的可执行文件保留）
             for f in [tmp_src, tmp_exe]:
                 if f.exists():
                     try:
@@ -604,6 +881,8 @@ class CompilerTester:
 
     def _is_compiler_ready(self) -> bool:
         """检查编译器是否已编译"""
+        if self._compiler_ready_cached is not None:
+            return self._compiler_ready_cached
         lang = self.compiler_config.language
         if lang == "java":
             return self.compiler_jar.exists()
@@ -642,8 +921,7 @@ class CompilerTester:
 
         # 清理旧的统计文件，避免误读上一次结果
         stats_path = worker_dir / "InstructionStatistics.txt"
-        if stats_path.exists():
-            stats_path.unlink()
+        stats_path.unlink(missing_ok=True)
         
         # 2. 运行Mars
         mars_out, mars_err = self._run_mars(input_file, worker_dir)
@@ -668,8 +946,13 @@ class CompilerTester:
                 cycle_breakdown=cycle_breakdown,
             )
         
-        # 4. 比较结果
-        if compare_outputs(mars_out, gcc_out):
+        # 4. 比较结果：字节完全相同直接通过，否则解码后按行规范化比较
+        passed = mars_out == gcc_out
+        if not passed:
+            mars_out = _decode(mars_out)
+            gcc_out = _decode(gcc_out)
+            passed = compare_outputs(mars_out, gcc_out)
+        if passed:
             return TestResult(
                 TestStatus.PASSED,
                 compile_time_ms=compile_time_ms,
@@ -690,8 +973,7 @@ class CompilerTester:
         cases: List[TestCase],
         max_workers: int = 4,
         callback=None,
-        ramp_up_time: float = 5.0,
-        ramp_up_threshold: int = 64
+        stop_event: Optional[threading.Event] = None
     ) -> List[Tuple[TestCase, TestResult]]:
         """
         并行测试多个用例
@@ -700,64 +982,81 @@ class CompilerTester:
             cases: 测试用例列表
             max_workers: 最大并行数
             callback: 回调函数 callback(case, result, progress)
-            ramp_up_time: 渐进启动总时间（秒）
-            ramp_up_threshold: 测试用例数量阈值，低于此值立即全部启动
+            stop_event: 停止信号，置位后不再启动新用例（配合 terminate_running 结束子进程）
         
         Returns:
             [(case, result), ...]
         """
-        import time
-        
         if not self._is_compiler_ready():
             return [(c, TestResult(TestStatus.SKIPPED, "请先编译项目")) for c in cases]
         
+        # 实例可能被复用，每轮重新分配 worker_id，避免线程标识被回收后撞上旧映射
+        with self._worker_id_lock:
+            self._thread_worker_ids = {}
+            self._next_worker_id = 0
+        if stop_event is None:
+            stop_event = threading.Event()
+        self._stop_event = stop_event
+        
         results = []
         total = len(cases)
         completed = 0
-        lock = threading.Lock()
+        
+        run_case = self.test
+        get_worker_id = self._get_thread_worker_id
         
         def run_test(task: TestTask) -> Tuple[TestCase, TestResult]:
+            if stop_event.is_set():
+                return task.case, TestResult(TestStatus.SKIPPED, "已停止")
             # worker_id 由线程动态分配，确保每个线程有独立工作目录
-            worker_id = self._get_thread_worker_id(max_workers)
-            result = self.test(task.case.testfile, task.case.input_file, worker_id)
-            return task.case, result
+            case = task.case
+            result = run_case(case.testfile, case.input_file, get_worker_id(max_workers))
+            return case, result
         
         tasks = [TestTask(case) for case in cases]
         
-        # 决定是否渐进启动
-        use_ramp_up = total >= ramp_up_threshold
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {}
-            
-            if use_ramp_up:
-                # 渐进式启动：在 ramp_up_time 秒内均匀提交所有任务
-                interval = ramp_up_time / total if total > 0 else 0
-                for i, task in enumerate(tasks):
-                    futures[executor.submit(run_test, task)] = task
-                    if i < total - 1:  # 最后一个不需要等待
-                        time.sleep(interval)
-            else:
-                # 立即全部启动
+        self._compiler_ready_cached = True
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # 一次性提交全部任务，并发度由线程池的 max_workers 限制
                 futures = {executor.submit(run_test, task): task for task in tasks}
-            
-            for future in as_completed(futures):
-                case, result = future.result()
-                with lock:
+                
+                # as_completed 只在调用线程中迭代，结果收集与回调无需加锁；
+                # 工作线程几乎全部时间阻塞在子进程等待上（不持有 GIL）
+                cancelled = False
+                for future in as_completed(futures):
+                    if not cancelled and stop_event.is_set():
+                        # 取消尚未开始的用例；已完成的照常回调
+                        cancelled = True
+                        for pending in futures:
+                            pending.cancel()
+                    if future.cancelled():
+                        continue
+                    case, result = future.result()
                     results.append((case, result))
                     completed += 1
-                
-                if callback:
-                    callback(case, result, completed / total * 100)
+                    
+                    if callback:
+                        callback(case, result, completed / total * 100)
+        finally:
+            self._compiler_ready_cached = None
         
         return results
     
     def cleanup_workers(self):
         """清理所有工作目录"""
-        if self.work_dir.exists():
-            for item in self.work_dir.iterdir():
-                if item.is_dir() and item.name.startswith("worker_"):
-                    try:
-                        shutil.rmtree(item)
-                    except:
-                        pass
+        self._created_worker_dirs.clear()
+        try:
+            with os.scandir(self.work_dir) as it:
+                dirs = [
+                    entry.path for entry in it
+                    if entry.name.startswith("worker_") and entry.is_dir(follow_symlinks=False)
+                ]
+        except OSError:
+            return
+        if not dirs:
+            return
+        # 各目录互不相关，删除主要耗在文件系统调用上，并行进行
+        with ThreadPoolExecutor(max_workers=min(8, len(dirs))) as executor:
+            for path in dirs:
+                executor.submit(shutil.rmtree, path, ignore_errors=True)
@@ -1,6 +1,7 @@
 """
 工具函数模块
 """
+import os
 from pathlib import Path
 from typing import Optional
 
@@ -21,6 +22,25 @@ def read_file_safe(filepath: Path) -> str:
     return content.replace('\r\n', '\n').replace('\r', '\n')
 
 
+def write_file_atomic(filepath: Path, content: str) -> None:
+    """以 UTF-8 (LF) 原子写入文件：先写同目录临时文件，再 os.replace 替换"""
+    tmp_path = filepath.with_name(filepath.name + ".tmp")
+    data = memoryview(content.encode("utf-8"))
+    try:
+        # 直接用 fd 写入，绕过 Python 的缓冲 IO 层
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            while data:
+                data = data[os.write(fd, data):]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+
+
 def normalize_output(output: Optional[str]) -> str:
     """标准化输出用于比较"""
     if output is None: